@@ -0,0 +1,102 @@
+"""Exporta um milhão de vendas sintéticas e verifica o teto de memória.
+
+Popula um SQLite temporário (ou o banco de DATABASE_URL, se definido) com
+N vendas de uma loja de teste e consome a exportação inteira medindo o pico
+de alocações Python com tracemalloc. Falha se o pico passar do teto:
+
+    python -m benchmarks.export_memory --rows 1000000 --ceiling-mb 64 --format csv --gzip
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'export_memory.sqlite3')}"
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from src.core.dependencies import CurrentUser  # noqa: E402
+from src.database.database import Base, async_engine, engine  # noqa: E402
+from src.models.base_entity import utcnow  # noqa: E402
+from src.models.sale import Sale  # noqa: E402
+from src.models.store import Store  # noqa: E402
+from src.models.user import User  # noqa: E402
+from src.services.export_service import export_stream  # noqa: E402
+
+SEED_CHUNK = 50000
+FRUITS = ["banana", "maçã", "laranja", "uva", "manga", "pera"]
+
+def seed(rows):
+    Base.metadata.create_all(engine)
+    suffix = uuid.uuid4().hex[:12]
+    now = utcnow()
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            insert(User).values(name="export", email=f"export-{suffix}@exemplo.com", created_at=now, updated_at=now)
+            .returning(User.id)
+        ).scalar_one()
+        store_id = conn.execute(
+            insert(Store).values(_name="Loja export", _cnpj=suffix, _address="-", user_id=user_id,
+                                 created_at=now, updated_at=now)
+            .returning(Store.id)
+        ).scalar_one()
+        for start in range(0, rows, SEED_CHUNK):
+            conn.execute(insert(Sale), [
+                {"value": (i % 100) + 0.5, "quantity": i % 10 + 1, "fruit": FRUITS[i % len(FRUITS)],
+                 "store_id": store_id, "created_at": now, "updated_at": now}
+                for i in range(start, min(start + SEED_CHUNK, rows))
+            ])
+    return user_id, store_id
+
+def cleanup(user_id, store_id):
+    with engine.begin() as conn:
+        conn.execute(delete(Sale).where(Sale.store_id == store_id))
+        conn.execute(delete(Store).where(Store.id == store_id))
+        conn.execute(delete(User).where(User.id == user_id))
+
+async def consume(user, export_format, compress):
+    chunks, _, filename = export_stream("sales", user, export_format, compress)
+    total = 0
+    pieces = 0
+    async for chunk in chunks:
+        total += len(chunk)
+        pieces += 1
+    await async_engine.dispose()
+    return filename, total, pieces
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--ceiling-mb', type=float, default=64)
+    parser.add_argument('--format', default='csv', choices=['csv', 'parquet'])
+    parser.add_argument('--gzip', action='store_true')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    user_id, store_id = seed(args.rows)
+    print(f"{args.rows} vendas inseridas em {time.perf_counter() - start:.1f}s")
+    user = CurrentUser(id=user_id, name="export", email=None)
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        filename, total, pieces = asyncio.run(consume(user, args.format, args.gzip))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        cleanup(user_id, store_id)
+
+    peak_mb = peak / 2 ** 20
+    print(f"{filename}: {total / 2 ** 20:.1f} MiB em {pieces} blocos, {elapsed:.1f}s ({args.rows / elapsed:.0f} linhas/s)")
+    print(f"pico de memória (tracemalloc): {peak_mb:.1f} MiB, teto {args.ceiling_mb} MiB")
+    if peak_mb > args.ceiling_mb:
+        print("FALHA: exportação passou do teto de memória")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Vazão da importação de estoque em lote (INSERT ... ON CONFLICT por bloco).
+
+Monta um CSV de contagem com lojas x frutas, passa pelo mesmo caminho da
+rota POST /inventory/bulk (leitura, validação e upsert) e mede linhas por
+segundo na primeira carga (inserções), numa recontagem ("set") e num
+ajuste ("delta"). Sem DATABASE_URL usa um SQLite temporário:
+
+    python -m benchmarks.inventory_upsert --stores 30 --fruits 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'inventory_upsert.sqlite3')}"
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from src.core.bulk import parse_bulk_body, validate_rows  # noqa: E402
+from src.core.dependencies import CurrentUser  # noqa: E402
+from src.database.database import AsyncSessionLocal, Base, async_engine, engine  # noqa: E402
+from src.models.base_entity import utcnow  # noqa: E402
+from src.models.inventory import Inventory  # noqa: E402
+from src.models.store import Store  # noqa: E402
+from src.models.user import User  # noqa: E402
+from src.routes.inventory import InventoryCreate  # noqa: E402
+from src.services.inventory_service import InventoryService  # noqa: E402
+
+def seed(n_stores):
+    Base.metadata.create_all(engine)
+    suffix = uuid.uuid4().hex[:10]
+    now = utcnow()
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            insert(User).values(name="estoque", email=f"estoque-{suffix}@exemplo.com", created_at=now, updated_at=now)
+            .returning(User.id)
+        ).scalar_one()
+        store_ids = [
+            conn.execute(
+                insert(Store).values(_name=f"Loja {i}", _cnpj=f"{suffix}-{i}", _address="-", user_id=user_id,
+                                     created_at=now, updated_at=now)
+                .returning(Store.id)
+            ).scalar_one()
+            for i in range(n_stores)
+        ]
+    return user_id, store_ids
+
+def cleanup(user_id, store_ids):
+    with engine.begin() as conn:
+        conn.execute(delete(Inventory).where(Inventory.store_id.in_(store_ids)))
+        conn.execute(delete(Store).where(Store.id.in_(store_ids)))
+        conn.execute(delete(User).where(User.id == user_id))
+
+def stock_take_csv(store_ids, n_fruits, quantity):
+    lines = ["store_id,fruit,quantity,unit"]
+    lines.extend(f"{store_id},fruta-{f},{quantity},kg" for store_id in store_ids for f in range(n_fruits))
+    return "\n".join(lines).encode("utf-8")
+
+async def run_import(user, body, mode):
+    start = time.perf_counter()
+    rows = parse_bulk_body(body, "text/csv")
+    valid, errors = validate_rows(rows, InventoryCreate)
+    async with AsyncSessionLocal() as db:
+        report = await InventoryService(db).upsert_inventory_bulk(valid, mode, user)
+    return time.perf_counter() - start, len(rows), report["applied"], len(errors) + len(report["errors"])
+
+async def run(args, user, store_ids):
+    phases = [
+        ("carga inicial (set)", stock_take_csv(store_ids, args.fruits, 100), "set"),
+        ("recontagem (set)", stock_take_csv(store_ids, args.fruits, 80), "set"),
+        ("ajuste (delta)", stock_take_csv(store_ids, args.fruits, -5), "delta"),
+    ]
+    try:
+        for label, body, mode in phases:
+            elapsed, rows, applied, errors = await run_import(user, body, mode)
+            print(f"{label:<22} {rows} linhas em {elapsed:.2f}s ({rows / elapsed:,.0f} linhas/s), "
+                  f"aplicadas {applied}, erros {errors}")
+    finally:
+        await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stores', type=int, default=30)
+    parser.add_argument('--fruits', type=int, default=200)
+    args = parser.parse_args()
+
+    user_id, store_ids = seed(args.stores)
+    try:
+        asyncio.run(run(args, CurrentUser(id=user_id, name="estoque", email=None), store_ids))
+    finally:
+        cleanup(user_id, store_ids)
+
+if __name__ == '__main__':
+    main()
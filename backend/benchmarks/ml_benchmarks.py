@@ -0,0 +1,162 @@
+"""Micro-benchmarks do caminho de classificação, só com CPU e imagens sintéticas.
+
+Mede decodificação, pré-processamento, forward do Net por tamanho de lote e
+número de threads, e o endpoint /classify-fruit de ponta a ponta. O resultado
+é um JSON que pode ser comparado entre commits:
+
+    python -m benchmarks.ml_benchmarks --output atual.json --compare anterior.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+
+# O benchmark deve ser reprodutível: CPU, sem cache de resultados e sem fila de jobs
+os.environ.setdefault("ML_DEVICE", "cpu")
+os.environ.setdefault("ML_CACHE_SIZE", "0")
+os.environ.setdefault("ML_JOB_WORKERS", "0")
+os.environ.setdefault("ML_JOBS_DB", ":memory:")
+
+import io  # noqa: E402
+
+import torch  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from benchmarks.preprocessing import synthetic_image  # noqa: E402
+from src.ml.preprocessing import (  # noqa: E402
+    decode_image, fast_image_tensor, reference_image_tensor, to_input_tensor, transform
+)
+from src.ml.registry import registry  # noqa: E402
+
+def measure(fn, runs, warmup=3):
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "runs": runs,
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "p90_ms": timings[int(len(timings) * 0.9)] * 1000,
+        "min_ms": timings[0] * 1000,
+    }
+
+def bench_decode(images, runs):
+    results = {}
+    for label, data in images.items():
+        results[f"pil_full/{label}"] = measure(lambda: Image.open(io.BytesIO(data)).convert('RGB'), runs)
+        results[f"pil_draft/{label}"] = measure(lambda: decode_image(data), runs)
+    return results
+
+def bench_preprocess(images, runs):
+    results = {}
+    for label, data in images.items():
+        full = Image.open(io.BytesIO(data)).convert('RGB')
+        draft = decode_image(data)
+        results[f"torchvision_transform/{label}"] = measure(lambda: transform(full), runs)
+        results[f"fused_tensor/{label}"] = measure(lambda: to_input_tensor(draft), runs)
+        results[f"end_to_end_reference/{label}"] = measure(lambda: reference_image_tensor(data), runs)
+        results[f"end_to_end_fast/{label}"] = measure(lambda: fast_image_tensor(data), runs)
+    return results
+
+def bench_forward(batch_sizes, thread_counts, runs):
+    model = registry.get()
+    original_threads = torch.get_num_threads()
+    results = {}
+    try:
+        for threads in thread_counts:
+            torch.set_num_threads(threads)
+            for batch_size in batch_sizes:
+                batch = torch.randn(batch_size, 3, 32, 32)
+
+                def forward():
+                    with torch.no_grad():
+                        model(batch)
+
+                stats = measure(forward, runs)
+                stats["images_per_second"] = batch_size / (stats["p50_ms"] / 1000)
+                results[f"threads={threads}/batch={batch_size}"] = stats
+    finally:
+        torch.set_num_threads(original_threads)
+    return results
+
+def bench_endpoint(data, runs):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from src.routes import ml
+
+    app = FastAPI()
+    app.include_router(ml.router)
+    app.add_event_handler("startup", ml.startup)
+    app.add_event_handler("shutdown", ml.shutdown)
+
+    with TestClient(app) as client:
+        def request():
+            response = client.post('/classify-fruit', files={'file': ('fruta.jpg', data, 'image/jpeg')})
+            response.raise_for_status()
+
+        return {"classify_fruit": measure(request, runs)}
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True).strip()
+    except Exception:
+        return None
+
+def compare(current, previous):
+    for section, entries in current["results"].items():
+        for name, stats in entries.items():
+            before = previous.get("results", {}).get(section, {}).get(name)
+            if before:
+                ratio = stats["p50_ms"] / before["p50_ms"] if before["p50_ms"] else float('inf')
+                print(f"{section:<10} {name:<45} {before['p50_ms']:9.3f} -> {stats['p50_ms']:9.3f} ms ({ratio:.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32, 64])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--skip-endpoint', action='store_true')
+    parser.add_argument('--output', default='ml_benchmarks.json')
+    parser.add_argument('--compare', help='JSON de uma execução anterior')
+    args = parser.parse_args()
+
+    images = {
+        "640x480": synthetic_image(640, 480),
+        "4000x3000": synthetic_image(4000, 3000),
+    }
+    results = {
+        "decode": bench_decode(images, args.runs),
+        "preprocess": bench_preprocess(images, args.runs),
+        "forward": bench_forward(args.batch_sizes, args.threads, args.runs * 4),
+    }
+    if not args.skip_endpoint:
+        results["endpoint"] = bench_endpoint(images["4000x3000"], args.runs)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados gravados em {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+if __name__ == '__main__':
+    main()
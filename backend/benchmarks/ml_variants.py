@@ -0,0 +1,98 @@
+"""Relatório de latência, tamanho e concordância das variantes otimizadas do Net.
+
+Uso (a partir de backend/):
+    python -m benchmarks.ml_variants --images /caminho/para/imagens --json variantes.json
+
+Sem --images, a concordância é medida em entradas sintéticas.
+"""
+import argparse
+import json
+import os
+import time
+
+import torch
+
+from src.ml.model import Net
+from src.ml.preprocessing import load_image_tensor
+from src.ml.registry import DEFAULT_MODEL_PATH
+from src.ml.variants import VARIANTS, build_variant, serialized_size
+
+def load_float_model(path):
+    model = Net()
+    model.load_state_dict(torch.load(path, map_location='cpu'))
+    return model.eval()
+
+def load_inputs(images_dir, limit):
+    if images_dir:
+        tensors = []
+        for name in sorted(os.listdir(images_dir))[:limit]:
+            try:
+                with open(os.path.join(images_dir, name), 'rb') as f:
+                    tensors.append(load_image_tensor(f.read()))
+            except Exception:
+                continue
+        if tensors:
+            return torch.stack(tensors)
+    return torch.randn(limit, 3, 32, 32, generator=torch.Generator().manual_seed(1))
+
+def latency_ms(model, batch_size, runs):
+    batch = torch.randn(batch_size, 3, 32, 32)
+    with torch.no_grad():
+        for _ in range(3):
+            model(batch)
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            model(batch)
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {"p50": timings[len(timings) // 2] * 1000, "p99": timings[int(len(timings) * 0.99)] * 1000}
+
+def predictions(model, inputs, batch_size=64):
+    preds = []
+    with torch.no_grad():
+        for start in range(0, len(inputs), batch_size):
+            preds.append(torch.argmax(model(inputs[start:start + batch_size]), dim=1))
+    return torch.cat(preds)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH)
+    parser.add_argument('--images', help='Pasta com imagens separadas do treino')
+    parser.add_argument('--limit', type=int, default=1000)
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--variants', nargs='+', default=list(VARIANTS))
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--json', help='Arquivo de saída com os resultados')
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    float_model = load_float_model(args.model)
+    inputs = load_inputs(args.images, args.limit)
+    reference = predictions(float_model, inputs)
+
+    report = []
+    for name in args.variants:
+        # Uma variante quebrada (na construção ou no forward) não interrompe o relatório das demais
+        try:
+            model = build_variant(load_float_model(args.model), name)
+            row = {
+                "variant": name,
+                "size_bytes": serialized_size(model),
+                "agreement": float((predictions(model, inputs) == reference).float().mean()),
+                "latency_ms": {str(bs): latency_ms(model, bs, args.runs) for bs in args.batch_sizes},
+            }
+        except Exception as e:
+            print(f"{name:<14} indisponível: {e}")
+            continue
+        report.append(row)
+        latencies = "  ".join(f"b{bs}: {row['latency_ms'][str(bs)]['p50']:.3f}ms" for bs in args.batch_sizes)
+        print(f"{name:<14} {row['size_bytes'] / 1024:8.1f} KiB  concordância {row['agreement'] * 100:6.2f}%  {latencies}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"inputs": len(inputs), "threads": args.threads, "variants": report}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
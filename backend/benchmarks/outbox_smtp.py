@@ -0,0 +1,124 @@
+"""Exercita o despachante do outbox contra um servidor SMTP local de mentira.
+
+Sobe um SMTP mínimo em 127.0.0.1 (sem TLS e sem login), grava notificações
+no outbox de um SQLite temporário e mede quantas conexões e mensagens o
+despachante usa. Com --fail-first N as N primeiras mensagens são recusadas
+(451) para exercitar as novas tentativas; com --digest as notificações da
+mesma loja saem em um único resumo.
+
+    python -m benchmarks.outbox_smtp --notifications 500 --stores 5 --fail-first 3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Nada de Gmail aqui: o SMTP de teste aceita qualquer remetente sem autenticação
+os.environ["EMAIL_ADDRESS"] = "fruit-checker@exemplo.com"
+os.environ["EMAIL_PASSWORD"] = ""
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'outbox.sqlite3')}"
+
+from src.core.email_utils import SMTPConnection  # noqa: E402
+from src.core.outbox import SENT, OutboxDispatcher, enqueue_notification  # noqa: E402
+from src.database.database import AsyncSessionLocal, Base, async_engine  # noqa: E402
+from src.models import notification  # noqa: E402,F401
+
+class StandInSMTP:
+    """Servidor SMTP só com o necessário para o smtplib: EHLO, MAIL, RCPT, DATA, QUIT."""
+
+    def __init__(self, fail_first=0):
+        self.fail_remaining = fail_first
+        self.connections = 0
+        self.messages = []
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        writer.write(b"220 stand-in\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                writer.write(b"250 stand-in\r\n")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                writer.write(b"250 OK\r\n")
+            elif command == "DATA":
+                writer.write(b"354 fim com <CRLF>.<CRLF>\r\n")
+                await writer.drain()
+                data = []
+                while (chunk := await reader.readline()) not in (b".\r\n", b""):
+                    data.append(chunk)
+                if self.fail_remaining > 0:
+                    self.fail_remaining -= 1
+                    writer.write(b"451 falha temporaria\r\n")
+                else:
+                    self.messages.append(b"".join(data))
+                    writer.write(b"250 OK\r\n")
+            elif command == "QUIT":
+                writer.write(b"221 tchau\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"502 comando nao suportado\r\n")
+            await writer.drain()
+        writer.close()
+
+async def run(args):
+    smtp = StandInSMTP(fail_first=args.fail_first)
+    server = await asyncio.start_server(smtp.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        for i in range(args.notifications):
+            store_id = i % args.stores
+            enqueue_notification(db, f"dono{store_id}@exemplo.com", f"Nova venda {i}", f"Venda {i} na loja {store_id}",
+                                 kind="sale", store_id=store_id)
+        await db.commit()
+
+    dispatcher = OutboxDispatcher(
+        connection_factory=lambda: SMTPConnection(host="127.0.0.1", port=port, use_ssl=False),
+        batch_size=args.batch_size, retry_backoff=0, digest=args.digest
+    )
+    start = time.perf_counter()
+    rounds = 0
+    while await dispatcher.run_once():
+        rounds += 1
+    elapsed = time.perf_counter() - start
+    stats = await dispatcher.stats()
+    await dispatcher.stop()
+    server.close()
+    await server.wait_closed()
+    await async_engine.dispose()
+
+    print(f"{args.notifications} notificações em {rounds} lotes, {elapsed:.2f}s ({args.notifications / elapsed:.0f}/s)")
+    print(f"conexões SMTP: {smtp.connections}, mensagens entregues: {len(smtp.messages)}, outbox: {stats}")
+    failures = []
+    if stats.get(SENT, 0) != args.notifications:
+        failures.append("nem todas as notificações foram marcadas como enviadas")
+    if not args.digest and len(smtp.messages) != args.notifications:
+        failures.append(f"esperadas {args.notifications} mensagens")
+    # Cada recusa derruba a conexão; fora isso ela é reaproveitada
+    if smtp.connections > 1 + args.fail_first:
+        failures.append("conexão SMTP não foi reaproveitada")
+    for failure in failures:
+        print(f"FALHA: {failure}")
+    return not failures
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--notifications', type=int, default=200)
+    parser.add_argument('--stores', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--fail-first', type=int, default=0)
+    parser.add_argument('--digest', action='store_true')
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args)) else 1)
+
+if __name__ == '__main__':
+    main()
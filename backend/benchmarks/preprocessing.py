@@ -0,0 +1,64 @@
+"""Compara o pré-processamento rápido com o pipeline original do torchvision.
+
+Uso (a partir de backend/):
+    python -m benchmarks.preprocessing --width 4000 --height 3000 --runs 20
+"""
+import argparse
+import io
+import time
+
+import numpy as np
+from PIL import Image
+
+from src.ml.preprocessing import fast_image_tensor, reference_image_tensor
+
+# Medido: ~0.018 de diferença máxima em um JPEG 1600x1200; folga para variações do decodificador
+PARITY_TOLERANCE = 0.03
+
+def synthetic_image(width, height, seed=0, format='JPEG'):
+    rng = np.random.default_rng(seed)
+    # Gradiente com ruído leve: parecido com uma foto em tamanho de arquivo e conteúdo
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x / width, y / height, (x + y) / (width + height)], axis=-1) * 255
+    noise = rng.normal(0, 12, size=(height, width, 3))
+    pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format=format, **({'quality': 90} if format == 'JPEG' else {}))
+    return buffer.getvalue()
+
+def timeit(fn, data, runs):
+    fn(data)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(data)
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--width', type=int, default=4000)
+    parser.add_argument('--height', type=int, default=3000)
+    parser.add_argument('--runs', type=int, default=20)
+    # Diferença máxima absoluta aceita (em unidades normalizadas); a suíte de testes usa o mesmo limite
+    parser.add_argument('--tolerance', type=float, default=PARITY_TOLERANCE)
+    args = parser.parse_args()
+
+    data = synthetic_image(args.width, args.height)
+    reference = reference_image_tensor(data)
+    fast = fast_image_tensor(data)
+    max_diff = float((reference - fast).abs().max())
+    mean_diff = float((reference - fast).abs().mean())
+
+    reference_ms = timeit(reference_image_tensor, data, args.runs)
+    fast_ms = timeit(fast_image_tensor, data, args.runs)
+
+    print(f"Imagem: {args.width}x{args.height} JPEG ({len(data) / 1024:.0f} KiB)")
+    print(f"Paridade: diferença máxima {max_diff:.4f}, média {mean_diff:.4f}")
+    print(f"Pipeline original: {reference_ms:.1f} ms (mediana)")
+    print(f"Caminho rápido:    {fast_ms:.1f} ms (mediana) -> {reference_ms / fast_ms:.1f}x")
+    if max_diff > args.tolerance:
+        raise SystemExit(f"Diferença máxima acima da tolerância ({args.tolerance})")
+
+if __name__ == '__main__':
+    main()
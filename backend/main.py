@@ -1,16 +1,20 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
-from src.routes import auth, stores, sales, inventory, suppliers, ml
-from src.database.database import Base, engine
+from src.routes import auth, stores, sales, inventory, suppliers, analytics, exports, events, ml
+from src.database.migrate import DB_AUTO_MIGRATE, upgrade_to_head
+from src.database.query_counter import DB_QUERY_COUNT_HEADER, QueryCountMiddleware
+from src.core.outbox import NOTIFY_DISPATCHER, outbox_dispatcher
+from src.core.events import broker
 import os
 from dotenv import load_dotenv
 
 # Carregar variáveis de ambiente
 load_dotenv('src/core/.env')
 
-# Criar tabelas
-Base.metadata.create_all(bind=engine)
+# Aplicar migrações do banco (alembic)
+if DB_AUTO_MIGRATE:
+    upgrade_to_head()
 
 app = FastAPI()
 
@@ -22,6 +26,10 @@ app.add_middleware(
     https_only=False  # Mudar para True em produção
 )
 
+# Contar os comandos SQL de cada requisição (cabeçalho X-Query-Count), só quando ligado
+if DB_QUERY_COUNT_HEADER:
+    app.add_middleware(QueryCountMiddleware)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -37,8 +45,40 @@ app.include_router(stores.router)
 app.include_router(sales.router)
 app.include_router(inventory.router)
 app.include_router(suppliers.router)
+app.include_router(analytics.router)
+app.include_router(exports.router)
+app.include_router(events.router)
 app.include_router(ml.router)
 
+@app.on_event("startup")
+async def startup_ml():
+    # Carregar e aquecer o modelo no dispositivo disponível (CPU ou CUDA)
+    await ml.startup()
+
+@app.on_event("startup")
+async def startup_notifications():
+    # Enviar os e-mails do outbox em segundo plano
+    if NOTIFY_DISPATCHER:
+        outbox_dispatcher.start()
+
+@app.on_event("startup")
+async def startup_events():
+    # Com EVENTS_BROKER=relay, conecta ao relay que repassa os eventos entre os workers
+    await broker.start()
+
+@app.on_event("shutdown")
+async def shutdown_ml():
+    # Encerrar o batcher e o pool de inferência de forma limpa
+    await ml.shutdown()
+
+@app.on_event("shutdown")
+async def shutdown_notifications():
+    await outbox_dispatcher.stop()
+
+@app.on_event("shutdown")
+async def shutdown_events():
+    await broker.stop()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""initial schema
+
+Esquema criado até aqui por Base.metadata.create_all. As tabelas só são
+criadas se ainda não existirem, para que bancos antigos adotem as migrações
+sem precisar de `alembic stamp`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('email', sa.String(), nullable=False, unique=True),
+            sa.Column('created_at', sa.String()),
+            sa.Column('updated_at', sa.String()),
+        )
+        op.create_index('ix_users_id', 'users', ['id'])
+
+    if 'stores' not in existing:
+        op.create_table(
+            'stores',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('cnpj', sa.String(), nullable=False, unique=True),
+            sa.Column('employees', sa.Integer()),
+            sa.Column('address', sa.String(), nullable=False),
+            sa.Column('phone', sa.String()),
+            sa.Column('email', sa.String()),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('created_at', sa.String()),
+            sa.Column('updated_at', sa.String()),
+        )
+        op.create_index('ix_stores_id', 'stores', ['id'])
+
+    if 'sales' not in existing:
+        op.create_table(
+            'sales',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('value', sa.Float(), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.Column('fruit', sa.String(), nullable=False),
+            sa.Column('store_id', sa.Integer(), sa.ForeignKey('stores.id'), nullable=False),
+            sa.Column('created_at', sa.String()),
+            sa.Column('updated_at', sa.String()),
+        )
+        op.create_index('ix_sales_id', 'sales', ['id'])
+
+    if 'inventory' not in existing:
+        op.create_table(
+            'inventory',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('fruit', sa.String(), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.Column('unit', sa.String(), nullable=False),
+            sa.Column('store_id', sa.Integer(), sa.ForeignKey('stores.id'), nullable=False),
+            sa.Column('created_at', sa.String()),
+            sa.Column('updated_at', sa.String()),
+        )
+        op.create_index('ix_inventory_id', 'inventory', ['id'])
+
+    if 'suppliers' not in existing:
+        op.create_table(
+            'suppliers',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('cnpj', sa.String(), nullable=False),
+            sa.Column('address', sa.String(), nullable=False),
+            sa.Column('fruits', sa.Text()),
+            sa.Column('store_id', sa.Integer(), sa.ForeignKey('stores.id'), nullable=False),
+            sa.Column('created_at', sa.String()),
+            sa.Column('updated_at', sa.String()),
+        )
+        op.create_index('ix_suppliers_id', 'suppliers', ['id'])
+
+
+def downgrade():
+    for table in ('suppliers', 'inventory', 'sales', 'stores', 'users'):
+        op.drop_table(table)
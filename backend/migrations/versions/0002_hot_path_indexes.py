@@ -0,0 +1,62 @@
+"""hot path indexes
+
+Índices para os filtros mais frequentes dos serviços. `users.email` já tem
+índice único desde o esquema inicial. Antes das restrições únicas, as
+duplicatas são consolidadas na linha de menor id: no estoque as quantidades
+da mesma fruta são somadas; fornecedores com o mesmo CNPJ na loja são
+removidos, mantendo o primeiro cadastro.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def duplicate_of(table, columns, relation):
+    # Existe outra linha com a mesma chave e id `relation` ao da linha atual (NULL nunca é duplicata)
+    same_key = ' AND '.join(f"other.{column} = {table}.{column}" for column in columns)
+    return f"EXISTS (SELECT 1 FROM {table} other WHERE {same_key} AND other.id {relation} {table}.id)"
+
+
+def merge_inventory_duplicates():
+    key = ('store_id', 'fruit')
+    op.execute(
+        "UPDATE inventory SET quantity = ("
+        "SELECT SUM(other.quantity) FROM inventory other "
+        "WHERE other.store_id = inventory.store_id AND other.fruit = inventory.fruit) "
+        f"WHERE NOT {duplicate_of('inventory', key, '<')} AND {duplicate_of('inventory', key, '>')}"
+    )
+    op.execute(f"DELETE FROM inventory WHERE {duplicate_of('inventory', key, '<')}")
+
+
+def drop_supplier_duplicates():
+    op.execute(f"DELETE FROM suppliers WHERE {duplicate_of('suppliers', ('store_id', 'cnpj'), '<')}")
+
+
+def upgrade():
+    # Posse das lojas (Store.user_id) e vendas por loja
+    op.create_index('ix_stores_user_id', 'stores', ['user_id'])
+    op.create_index('ix_sales_store_id', 'sales', ['store_id'])
+    # Uma fruta por loja: substitui a verificação prévia em create_inventory_item
+    merge_inventory_duplicates()
+    drop_supplier_duplicates()
+    with op.batch_alter_table('inventory') as batch_op:
+        batch_op.create_unique_constraint('uq_inventory_store_fruit', ['store_id', 'fruit'])
+    with op.batch_alter_table('suppliers') as batch_op:
+        batch_op.create_unique_constraint('uq_suppliers_store_cnpj', ['store_id', 'cnpj'])
+
+
+def downgrade():
+    with op.batch_alter_table('suppliers') as batch_op:
+        batch_op.drop_constraint('uq_suppliers_store_cnpj', type_='unique')
+    with op.batch_alter_table('inventory') as batch_op:
+        batch_op.drop_constraint('uq_inventory_store_fruit', type_='unique')
+    op.drop_index('ix_sales_store_id', table_name='sales')
+    op.drop_index('ix_stores_user_id', table_name='stores')
@@ -0,0 +1,103 @@
+"""typed timestamps
+
+Converte created_at/updated_at de texto ISO para timestamp com fuso horário
+e cria o índice (store_id, created_at) em sales. Os valores antigos foram
+gravados com datetime.now() sem fuso, no horário local do servidor
+(LEGACY_TIMESTAMP_TZ, padrão America/Sao_Paulo) e são convertidos para UTC
+nos dois bancos. Valores vazios recebem a outra data da linha (ou o horário
+da migração); valores que não são datas ISO interrompem a migração.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+import os
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+TABLES = ('users', 'stores', 'sales', 'inventory', 'suppliers')
+LEGACY_TIMESTAMP_TZ = os.getenv('LEGACY_TIMESTAMP_TZ', 'America/Sao_Paulo')
+# Formato em que o SQLAlchemy grava DateTime no SQLite (UTC, sem fuso)
+SQLITE_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
+def fill_missing(table):
+    # Vazio não vira NULL: created_at herda updated_at e vice-versa; sem nenhum dos dois, o horário da migração
+    now = datetime.now(ZoneInfo(LEGACY_TIMESTAMP_TZ)).replace(tzinfo=None).isoformat()
+    op.execute(
+        f"UPDATE {table} SET created_at = COALESCE(NULLIF(updated_at, ''), '{now}') "
+        "WHERE created_at IS NULL OR created_at = ''"
+    )
+    op.execute(f"UPDATE {table} SET updated_at = created_at WHERE updated_at IS NULL OR updated_at = ''")
+
+
+def sqlite_convert(bind, table, column, convert):
+    # SQLite não conhece fusos por nome: a conversão é feita linha a linha em Python
+    updates = []
+    for row_id, value in bind.execute(sa.text(f"SELECT id, {column} FROM {table} WHERE {column} IS NOT NULL")):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise RuntimeError(f"{table}.{column} da linha {row_id} não é uma data ISO: {value!r}")
+        updates.append({"id": row_id, "value": convert(parsed)})
+    if updates:
+        bind.execute(sa.text(f"UPDATE {table} SET {column} = :value WHERE id = :id"), updates)
+
+
+def legacy_to_utc(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=ZoneInfo(LEGACY_TIMESTAMP_TZ))
+    return value.astimezone(timezone.utc).strftime(SQLITE_DATETIME_FORMAT)
+
+
+def utc_to_legacy(value):
+    local = value.replace(tzinfo=value.tzinfo or timezone.utc).astimezone(ZoneInfo(LEGACY_TIMESTAMP_TZ))
+    return local.replace(tzinfo=None).isoformat()
+
+
+def upgrade():
+    bind = op.get_bind()
+    for table in TABLES:
+        fill_missing(table)
+        for column in ('created_at', 'updated_at'):
+            if bind.dialect.name == 'postgresql':
+                # Um texto que não é data faz o cast falhar e a migração é desfeita
+                op.execute(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE TIMESTAMP WITH TIME ZONE "
+                    f"USING ({column}::timestamp AT TIME ZONE '{LEGACY_TIMESTAMP_TZ}')"
+                )
+            else:
+                # Mesmo instante que no Postgres: horário local legado convertido para UTC
+                sqlite_convert(bind, table, column, legacy_to_utc)
+                with op.batch_alter_table(table) as batch_op:
+                    batch_op.alter_column(column, type_=sa.DateTime(timezone=True), existing_type=sa.String())
+
+    op.create_index('ix_sales_store_id_created_at', 'sales', ['store_id', 'created_at'])
+    # O índice composto cobre as buscas só por store_id
+    op.drop_index('ix_sales_store_id', table_name='sales')
+
+
+def downgrade():
+    op.create_index('ix_sales_store_id', 'sales', ['store_id'])
+    op.drop_index('ix_sales_store_id_created_at', table_name='sales')
+    bind = op.get_bind()
+    for table in TABLES:
+        for column in ('created_at', 'updated_at'):
+            if bind.dialect.name == 'postgresql':
+                op.execute(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE VARCHAR "
+                    f"USING to_char({column} AT TIME ZONE '{LEGACY_TIMESTAMP_TZ}', 'YYYY-MM-DD\"T\"HH24:MI:SS.US')"
+                )
+            else:
+                with op.batch_alter_table(table) as batch_op:
+                    batch_op.alter_column(column, type_=sa.String(), existing_type=sa.DateTime(timezone=True))
+                sqlite_convert(bind, table, column, utc_to_legacy)
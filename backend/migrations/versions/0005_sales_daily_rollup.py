@@ -0,0 +1,56 @@
+"""sales daily rollup
+
+Totais diários por (loja, fruta, dia) para os endpoints de analytics. A
+tabela é preenchida a partir das vendas já existentes com um único
+INSERT ... SELECT ... GROUP BY; o dia é a data local em ROLLUP_TIMEZONE. O
+recálculo pode ser refeito depois com `python -m src.database.rollups`.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+import os
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+ROLLUP_TIMEZONE = os.getenv('ROLLUP_TIMEZONE', 'America/Sao_Paulo')
+
+
+def local_day(dialect_name):
+    if dialect_name == 'postgresql':
+        return f"(created_at AT TIME ZONE '{ROLLUP_TIMEZONE}')::date"
+    # SQLite não conhece fusos por nome: usa o deslocamento atual do fuso (sem horário de verão em São Paulo)
+    offset = datetime.now(ZoneInfo(ROLLUP_TIMEZONE)).utcoffset()
+    return f"date(created_at, '{int(offset.total_seconds() // 60)} minutes')"
+
+
+def upgrade():
+    op.create_table(
+        'sales_daily_rollup',
+        sa.Column('store_id', sa.Integer(), primary_key=True),
+        sa.Column('fruit', sa.String(), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('sales_count', sa.Integer(), nullable=False),
+    )
+    day = local_day(op.get_bind().dialect.name)
+    op.execute(
+        "INSERT INTO sales_daily_rollup (store_id, fruit, day, revenue, quantity, sales_count) "
+        f"SELECT store_id, fruit, {day}, COALESCE(SUM(value), 0), COALESCE(SUM(quantity), 0), COUNT(*) "
+        "FROM sales WHERE created_at IS NOT NULL "
+        f"GROUP BY store_id, fruit, {day}"
+    )
+
+
+def downgrade():
+    op.drop_table('sales_daily_rollup')
@@ -0,0 +1,41 @@
+"""created_at not null
+
+Torna created_at obrigatório em todas as tabelas da BaseEntity. A paginação
+ordena por (created_at, id) direto na coluna, usando o índice
+(store_id, created_at) de sales; uma linha com created_at NULL nunca entra
+nessa comparação e sumiria das páginas seguintes. Linhas sem data recebem
+updated_at ou, sem ele, o horário da migração.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+TABLES = ('users', 'stores', 'sales', 'inventory', 'suppliers', 'notification_outbox')
+
+
+def upgrade():
+    now = sa.bindparam('now', datetime.now(timezone.utc), type_=sa.DateTime(timezone=True))
+    for table in TABLES:
+        op.execute(
+            sa.text(f"UPDATE {table} SET created_at = COALESCE(updated_at, :now) WHERE created_at IS NULL")
+            .bindparams(now)
+        )
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(timezone=True), nullable=True)
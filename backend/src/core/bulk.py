@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+import os
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+
+# Limite de linhas por requisição de importação em lote
+BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", "20000"))
+
+class BulkRowError(BaseModel):
+    row: int
+    detail: str
+
+def parse_bulk_body(body, content_type):
+    """Converte um corpo JSON (lista), NDJSON ou CSV em uma lista de linhas.
+
+    Cada item é `(numero_da_linha, dict)` ou `(numero_da_linha, erro)` quando a
+    linha não pôde ser lida; a numeração começa em 1.
+    """
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="O corpo deve estar em UTF-8")
+
+    rows = []
+    if content_type in ("text/csv", "application/csv"):
+        for number, row in enumerate(csv.DictReader(io.StringIO(text)), start=1):
+            rows.append((number, {k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in row.items() if k}))
+    elif content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        for number, line in enumerate((l for l in text.splitlines() if l.strip()), start=1):
+            try:
+                rows.append((number, json.loads(line)))
+            except json.JSONDecodeError as e:
+                rows.append((number, f"JSON inválido: {e.msg}"))
+    else:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"JSON inválido: {e.msg}")
+        if not isinstance(data, list):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Esperada uma lista JSON")
+        rows = list(enumerate(data, start=1))
+
+    if len(rows) > BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo de {BULK_MAX_ROWS} linhas por requisição"
+        )
+    return rows
+
+def validate_rows(rows, schema):
+    """Valida cada linha com o modelo Pydantic; devolve (válidas, erros)."""
+    valid, errors = [], []
+    for number, row in rows:
+        if isinstance(row, str):
+            errors.append({"row": number, "detail": row})
+            continue
+        if not isinstance(row, dict):
+            errors.append({"row": number, "detail": "Cada linha deve ser um objeto"})
+            continue
+        try:
+            valid.append((number, schema.model_validate(row)))
+        except ValidationError as e:
+            detail = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            errors.append({"row": number, "detail": detail})
+    return valid, errors
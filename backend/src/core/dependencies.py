@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import Cookie, Depends, HTTPException, status
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.security import verify_token
+from src.database.database import get_async_db
+from src.models.user import User
+
+# Validade (s) e capacidade dos caches de token e de usuário
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "4096"))
+# E-mails com acesso às rotas de operação (troca de modelo, métricas), separados por vírgula
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Registro leve do usuário autenticado, seguro para compartilhar entre requisições."""
+    id: int
+    name: str
+    email: str
+
+
+class TTLCache:
+    def __init__(self, max_size=AUTH_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard_where(self, predicate):
+        with self._lock:
+            for key in [k for k, (v, _) in self._entries.items() if predicate(v)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class AuthCache:
+    """Tokens decodificados e usuários autenticados, com validade AUTH_CACHE_TTL.
+
+    A invalidação é local ao processo: com vários workers do uvicorn, um
+    usuário removido ou alterado em um worker continua válido nos outros
+    até o TTL expirar. Reduza AUTH_CACHE_TTL se essa janela for inaceitável.
+    """
+
+    def __init__(self, ttl=AUTH_CACHE_TTL):
+        self.ttl = ttl
+        self.tokens = TTLCache()
+        self.users = TTLCache()
+        self.token_decodes = 0
+        self.token_decodes_avoided = 0
+        self.db_lookups = 0
+        self.db_lookups_avoided = 0
+
+    def payload(self, token):
+        payload = self.tokens.get(token)
+        if payload is not None:
+            self.token_decodes_avoided += 1
+            return payload
+        self.token_decodes += 1
+        payload = verify_token(token)
+        # Nunca manter um token no cache além da sua expiração
+        ttl = min(self.ttl, payload.get("exp", float("inf")) - time.time())
+        if ttl > 0:
+            self.tokens.set(token, payload, ttl)
+        return payload
+
+    async def user(self, email, db):
+        user = self.users.get(email)
+        if user is not None:
+            self.db_lookups_avoided += 1
+            return user
+        self.db_lookups += 1
+        db_user = await db.scalar(select(User).where(User.email == email))
+        if not db_user:
+            return None
+        user = CurrentUser(id=db_user.id, name=db_user.name, email=db_user.email)
+        self.users.set(email, user, self.ttl)
+        return user
+
+    def invalidate_user(self, user_id):
+        self.users.discard_where(lambda user: user.id == user_id)
+
+    def stats(self):
+        return {
+            "cached_tokens": len(self.tokens),
+            "cached_users": len(self.users),
+            "token_decodes": self.token_decodes,
+            "token_decodes_avoided": self.token_decodes_avoided,
+            "db_lookups": self.db_lookups,
+            "db_lookups_avoided": self.db_lookups_avoided,
+        }
+
+
+auth_cache = AuthCache()
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    # Atualizações em massa (query.update) não disparam este evento: use auth_cache.invalidate_user
+    auth_cache.invalidate_user(target.id)
+
+# Dependência compartilhada por todas as rotas autenticadas
+async def get_current_user(access_token: str = Cookie(None), db: AsyncSession = Depends(get_async_db)):
+    if not access_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Não autenticado"
+        )
+    try:
+        payload = auth_cache.payload(access_token)
+        user = await auth_cache.user(payload["sub"], db)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido"
+        )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Usuário não encontrado"
+        )
+    return user
+
+# Rotas de operação: além de autenticado, o usuário precisa estar em ADMIN_EMAILS
+async def get_admin_user(current_user: CurrentUser = Depends(get_current_user)):
+    if (current_user.email or "").lower() not in ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso restrito a administradores"
+        )
+    return current_user
@@ -7,16 +7,69 @@ load_dotenv('src/core/.env')
 
 EMAIL_ADDRESS = os.getenv('EMAIL_ADDRESS')
 EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')
-print(EMAIL_ADDRESS, EMAIL_PASSWORD)
+# Servidor SMTP; para testes locais use, por exemplo, SMTP_HOST=127.0.0.1 SMTP_PORT=1025 SMTP_SSL=false
+SMTP_HOST = os.getenv('SMTP_HOST', 'smtp.gmail.com')
+SMTP_PORT = int(os.getenv('SMTP_PORT', '465'))
+SMTP_SSL = os.getenv('SMTP_SSL', 'true').lower() == 'true'
+SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', '30'))
 
-def send_email_notification(to_email: str, subject: str, body: str):
-    if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
-        raise Exception('EMAIL_ADDRESS ou EMAIL_PASSWORD não configurados no .env')
+def build_message(to_email: str, subject: str, body: str):
+    if not EMAIL_ADDRESS:
+        raise Exception('EMAIL_ADDRESS não configurado no .env')
     msg = EmailMessage()
     msg['Subject'] = subject
     msg['From'] = EMAIL_ADDRESS
     msg['To'] = to_email
     msg.set_content(body)
-    with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-        smtp.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-        smtp.send_message(msg) 
\ No newline at end of file
+    return msg
+
+class SMTPConnection:
+    """Conexão SMTP autenticada reaproveitada entre vários envios.
+
+    Abre e faz login no primeiro envio; se o servidor encerrar a sessão,
+    reconecta uma vez antes de desistir. Não é thread-safe: use uma por
+    despachante.
+    """
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, use_ssl=SMTP_SSL, timeout=SMTP_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self._smtp = None
+
+    def _connect(self):
+        smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        smtp = smtp_class(self.host, self.port, timeout=self.timeout)
+        # Sem senha (servidor local de testes) o envio é feito sem login
+        if EMAIL_PASSWORD:
+            smtp.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
+        self._smtp = smtp
+
+    def send(self, msg):
+        if self._smtp is None:
+            self._connect()
+        try:
+            self._smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self._smtp = None
+            self._connect()
+            self._smtp.send_message(msg)
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+def send_email_notification(to_email: str, subject: str, body: str):
+    # Envio avulso (uma conexão por e-mail); as notificações da API passam pelo outbox
+    if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
+        raise Exception('EMAIL_ADDRESS ou EMAIL_PASSWORD não configurados no .env')
+    connection = SMTPConnection()
+    try:
+        connection.send(build_message(to_email, subject, body))
+    finally:
+        connection.close()
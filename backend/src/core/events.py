@@ -0,0 +1,209 @@
+"""Eventos de alteração (vendas, estoque, fornecedores) enviados aos clientes conectados.
+
+Os serviços publicam um evento compacto depois de cada commit; a rota
+/events repassa por Server-Sent Events os eventos do usuário dono das lojas.
+Com um único worker a distribuição é feita em memória. Com vários workers,
+EVENTS_BROKER=relay faz cada processo enviar seus eventos a um relay local,
+que os repassa a todos os workers conectados:
+
+    python -m src.core.events relay 127.0.0.1:8765
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+
+from fastapi.encoders import jsonable_encoder
+
+# memory (um processo) ou relay (vários workers ligados ao relay de EVENTS_RELAY_ADDRESS)
+EVENTS_BROKER = os.getenv("EVENTS_BROKER", "memory")
+EVENTS_RELAY_ADDRESS = os.getenv("EVENTS_RELAY_ADDRESS", "127.0.0.1:8765")
+# Eventos pendentes por conexão; um cliente mais lento que isso recebe "resync" e recarrega a lista
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+# Buffer máximo (bytes) de um worker lento no relay antes de ser desconectado
+EVENTS_RELAY_MAX_BUFFER = int(os.getenv("EVENTS_RELAY_MAX_BUFFER", str(4 * 1024 * 1024)))
+
+RESYNC = "resync"
+
+logger = logging.getLogger(__name__)
+
+
+def _address(value):
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def entity_payload(entity, *fields):
+    return {field: getattr(entity, field) for field in fields}
+
+
+class Subscription:
+    def __init__(self, channel, queue_size=EVENTS_QUEUE_SIZE):
+        self.channel = channel
+        self.queue = asyncio.Queue(queue_size)
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Melhor pedir uma recarga do que entregar uma sequência de deltas com buracos
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": RESYNC, "store_id": None, "data": {}})
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InProcessBroker:
+    """Distribui os eventos para as conexões abertas neste processo, por canal (id do usuário)."""
+
+    def __init__(self, queue_size=EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._channels = {}
+
+    def subscribe(self, channel):
+        subscription = Subscription(channel, self.queue_size)
+        self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscribers = self._channels.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._channels[subscription.channel]
+
+    def publish(self, channel, event):
+        self._deliver(channel, event)
+
+    def _deliver(self, channel, event):
+        for subscription in list(self._channels.get(channel, ())):
+            subscription.offer(event)
+
+    def stats(self):
+        return {"channels": len(self._channels), "subscriptions": sum(len(s) for s in self._channels.values())}
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class RelayBroker(InProcessBroker):
+    """Publica no relay local e entrega aos assinantes deste processo tudo o que o relay repassa.
+
+    Enquanto o relay estiver fora do ar os eventos são entregues só localmente
+    e a conexão é refeita em segundo plano, com espera dobrando a cada falha
+    até `max_reconnect_delay`. Só a perda e a volta da conexão vão para o log.
+    """
+
+    def __init__(self, address=EVENTS_RELAY_ADDRESS, queue_size=EVENTS_QUEUE_SIZE, reconnect_delay=1.0,
+                 max_reconnect_delay=30.0):
+        super().__init__(queue_size)
+        self.host, self.port = _address(address)
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._writer = None
+        self._task = None
+
+    def publish(self, channel, event):
+        if self._writer is None or self._writer.is_closing():
+            self._deliver(channel, event)
+            return
+        self._writer.write((json.dumps({"channel": channel, "event": event}) + "\n").encode("utf-8"))
+
+    async def _run(self):
+        delay = self.reconnect_delay
+        connected = True
+        while True:
+            try:
+                reader, self._writer = await asyncio.open_connection(self.host, self.port)
+                if not connected:
+                    logger.info("Relay de eventos reconectado (%s:%s)", self.host, self.port)
+                    connected = True
+                delay = self.reconnect_delay
+                async for line in reader:
+                    message = json.loads(line)
+                    self._deliver(message["channel"], message["event"])
+                error = "conexão encerrada pelo relay"
+            except (OSError, ValueError) as e:
+                error = e
+            finally:
+                if self._writer is not None:
+                    self._writer.close()
+                    self._writer = None
+            if connected:
+                logger.warning("Relay de eventos indisponível (%s:%s): %s; entregando só localmente",
+                               self.host, self.port, error)
+                connected = False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def build_broker():
+    if EVENTS_BROKER == "relay":
+        return RelayBroker()
+    return InProcessBroker()
+
+
+broker = build_broker()
+
+
+def publish_event(user_id, event_type, store_id, data):
+    """Publica após o commit: {"type": "sale.created", "store_id": 1, "data": {...}}."""
+    broker.publish(user_id, {"type": event_type, "store_id": store_id, "data": jsonable_encoder(data)})
+
+
+async def run_relay(address=EVENTS_RELAY_ADDRESS):
+    workers = set()
+
+    async def handle(reader, writer):
+        workers.add(writer)
+        try:
+            async for line in reader:
+                for worker in list(workers):
+                    # Um worker que não consome o que recebe não pode segurar os demais
+                    if worker.transport.get_write_buffer_size() > EVENTS_RELAY_MAX_BUFFER:
+                        workers.discard(worker)
+                        worker.close()
+                    else:
+                        worker.write(line)
+        except ConnectionError:
+            # Worker encerrado sem fechar a conexão
+            pass
+        finally:
+            workers.discard(writer)
+            writer.close()
+
+    host, port = _address(address)
+    server = await asyncio.start_server(handle, host, port)
+    print(f"Relay de eventos em {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    # python -m src.core.events relay [host:porta]
+    if len(sys.argv) < 2 or sys.argv[1] != "relay":
+        raise SystemExit("Uso: python -m src.core.events relay [host:porta]")
+    asyncio.run(run_relay(sys.argv[2] if len(sys.argv) > 2 else EVENTS_RELAY_ADDRESS))
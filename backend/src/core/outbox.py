@@ -0,0 +1,203 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, update
+
+from src.core.email_utils import SMTPConnection, build_message
+from src.database.database import AsyncSessionLocal
+from src.models.base_entity import utcnow
+from src.models.notification import Notification
+
+# Despachante em segundo plano (desligar nas instâncias que não devem enviar e-mails)
+NOTIFY_DISPATCHER = os.getenv("NOTIFY_DISPATCHER", "true").lower() == "true"
+NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", "50"))
+NOTIFY_POLL_INTERVAL = float(os.getenv("NOTIFY_POLL_INTERVAL", "5"))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))
+# Espera (s) antes da primeira nova tentativa; dobra a cada falha
+NOTIFY_RETRY_BACKOFF = float(os.getenv("NOTIFY_RETRY_BACKOFF", "30"))
+# Tempo (s) após o qual um envio "sending" sem confirmação volta para a fila (processo morreu)
+NOTIFY_LEASE_SECONDS = float(os.getenv("NOTIFY_LEASE_SECONDS", "120"))
+# Janela (s) de resumo: notificações da mesma loja e destinatário viram um único e-mail. 0 desliga.
+NOTIFY_DIGEST_SECONDS = float(os.getenv("NOTIFY_DIGEST_SECONDS", "0"))
+# Fechar a conexão SMTP depois de tanto tempo (s) sem envios
+NOTIFY_IDLE_CLOSE_SECONDS = float(os.getenv("NOTIFY_IDLE_CLOSE_SECONDS", "60"))
+
+PENDING, SENDING, SENT, FAILED = "pending", "sending", "sent", "failed"
+
+
+def first_attempt_at(now, digest_seconds=NOTIFY_DIGEST_SECONDS):
+    if digest_seconds <= 0:
+        return now
+    # Alinhado ao fim da janela: tudo o que chega na mesma janela vence junto e sai em um resumo
+    boundary = (now.timestamp() // digest_seconds + 1) * digest_seconds
+    return datetime.fromtimestamp(boundary, timezone.utc)
+
+
+def enqueue_notification(db, to_email, subject, body, kind, store_id=None):
+    """Adiciona o e-mail à sessão; ele só existe se a transação do chamador for confirmada."""
+    now = utcnow()
+    db.add(Notification(
+        to_email=to_email, subject=subject, body=body, kind=kind, store_id=store_id,
+        status=PENDING, attempts=0, next_attempt_at=first_attempt_at(now), created_at=now, updated_at=now
+    ))
+
+
+class OutboxDispatcher:
+    """Envia as notificações pendentes do outbox em lotes.
+
+    Reserva até `batch_size` linhas vencidas (a reserva funciona como lease:
+    se o processo morrer, elas voltam a vencer), envia todas pela mesma
+    conexão SMTP autenticada e registra o resultado. Falhas voltam para a
+    fila com backoff exponencial até `max_attempts`.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, connection_factory=SMTPConnection,
+                 batch_size=NOTIFY_BATCH_SIZE, poll_interval=NOTIFY_POLL_INTERVAL,
+                 max_attempts=NOTIFY_MAX_ATTEMPTS, retry_backoff=NOTIFY_RETRY_BACKOFF,
+                 lease_seconds=NOTIFY_LEASE_SECONDS, digest=NOTIFY_DIGEST_SECONDS > 0):
+        self._session_factory = session_factory
+        self._connection = connection_factory()
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+        self.digest = digest
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._last_send = None
+
+    def wake(self):
+        # Chamado após o commit de quem gravou notificações, para não esperar o próximo ciclo
+        self._wakeup.set()
+
+    async def claim(self):
+        now = utcnow()
+        due = Notification.status.in_((PENDING, SENDING)) & (Notification.next_attempt_at <= now)
+        async with self._session_factory() as db:
+            ids = (await db.scalars(
+                select(Notification.id).where(due)
+                .order_by(Notification.next_attempt_at, Notification.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )).all()
+            if not ids:
+                return []
+            # A condição de vencimento é repetida: outro despachante que reservou antes já adiou as linhas
+            rows = (await db.execute(
+                update(Notification)
+                .where(Notification.id.in_(ids), due)
+                .values(status=SENDING, attempts=Notification.attempts + 1,
+                        next_attempt_at=now + timedelta(seconds=self.lease_seconds), updated_at=now)
+                .returning(Notification.id, Notification.to_email, Notification.subject,
+                           Notification.body, Notification.store_id, Notification.attempts)
+                .execution_options(synchronize_session=False)
+            )).all()
+            await db.commit()
+        return sorted(rows, key=lambda row: row.id)
+
+    def compose(self, rows):
+        """Agrupa as linhas reservadas em mensagens: [(ids, destinatário, assunto, corpo)]."""
+        if not self.digest:
+            return [([row.id], row.to_email, row.subject, row.body) for row in rows]
+        groups = {}
+        for row in rows:
+            groups.setdefault((row.to_email, row.store_id), []).append(row)
+        messages = []
+        for (to_email, _), group in groups.items():
+            if len(group) == 1:
+                row = group[0]
+                messages.append(([row.id], to_email, row.subject, row.body))
+                continue
+            body = "\n\n".join(f"{row.subject}\n{row.body}" for row in group)
+            messages.append(([row.id for row in group], to_email, f"Resumo de notificações ({len(group)})", body))
+        return messages
+
+    def _send(self, messages):
+        # Roda em uma thread: SMTP é bloqueante. Uma conexão para o lote inteiro.
+        results = []
+        for ids, to_email, subject, body in messages:
+            try:
+                self._connection.send(build_message(to_email, subject, body))
+            except Exception as e:
+                self._connection.close()
+                results.append((ids, str(e)))
+            else:
+                results.append((ids, None))
+        return results
+
+    async def record(self, rows, results):
+        now = utcnow()
+        attempts = {row.id: row.attempts for row in rows}
+        sent = [i for ids, error in results if error is None for i in ids]
+        async with self._session_factory() as db:
+            if sent:
+                await db.execute(
+                    update(Notification).where(Notification.id.in_(sent))
+                    .values(status=SENT, sent_at=now, last_error=None, updated_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+            for ids, error in results:
+                if error is None:
+                    continue
+                for i in ids:
+                    if attempts[i] >= self.max_attempts:
+                        values = {"status": FAILED}
+                    else:
+                        delay = self.retry_backoff * 2 ** (attempts[i] - 1)
+                        values = {"status": PENDING, "next_attempt_at": now + timedelta(seconds=delay)}
+                    await db.execute(
+                        update(Notification).where(Notification.id == i)
+                        .values(last_error=error, updated_at=now, **values)
+                        .execution_options(synchronize_session=False)
+                    )
+            await db.commit()
+
+    async def run_once(self):
+        """Processa um lote; devolve quantas notificações foram reservadas."""
+        rows = await self.claim()
+        if rows:
+            results = await asyncio.to_thread(self._send, self.compose(rows))
+            await self.record(rows, results)
+            self._last_send = time.monotonic()
+        return len(rows)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                if await self.run_once():
+                    continue
+            except Exception as e:
+                print(f"Erro ao despachar notificações: {e}")
+            if self._last_send is not None and time.monotonic() - self._last_send > NOTIFY_IDLE_CLOSE_SECONDS:
+                await asyncio.to_thread(self._connection.close)
+                self._last_send = None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self._connection.close)
+
+    async def stats(self):
+        async with self._session_factory() as db:
+            rows = await db.execute(select(Notification.status, func.count()).group_by(Notification.status))
+            return {status: count for status, count in rows}
+
+
+outbox_dispatcher = OutboxDispatcher()
@@ -0,0 +1,90 @@
+import base64
+import json
+from datetime import datetime
+from typing import Generic, List, Optional, TypeVar
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import tuple_
+
+PAGE_SIZE_DEFAULT = 50
+PAGE_SIZE_MAX = 500
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+
+class PageParams:
+    """Parâmetros de paginação por cursor (keyset), comuns a todas as listagens."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Cursor opaco devolvido pela página anterior"),
+        limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+        sort: Optional[str] = Query(None),
+        order: Optional[str] = Query(None, pattern="^(asc|desc)$"),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.sort = sort
+        self.order = order
+
+
+def _invalid_cursor():
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+
+def encode_cursor(sort, order, value, item_id):
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = json.dumps({"s": sort, "o": order, "v": value, "id": item_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor, sort, order):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = payload["v"]
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+        item_id = int(payload["id"])
+    except Exception:
+        raise _invalid_cursor()
+    # O cursor só vale para a mesma ordenação em que foi gerado
+    if payload.get("s") != sort or payload.get("o") != order:
+        raise _invalid_cursor()
+    return value, item_id
+
+async def paginate(db, query, model, params, sort_columns, default_sort, default_order="asc"):
+    """Aplica ordenação estável (coluna, id) e paginação por keyset a um SELECT de `model`.
+
+    `sort_columns` mapeia o nome aceito em `?sort=` para a coluna do modelo.
+    Busca `limit + 1` linhas para saber se existe uma próxima página.
+    """
+    sort = params.sort or default_sort
+    if sort not in sort_columns:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ordenação inválida. Opções: {', '.join(sort_columns)}"
+        )
+    column = sort_columns[sort]
+    order = params.order or default_order
+    descending = order == "desc"
+    key = tuple_(column, model.id)
+    if params.cursor:
+        boundary = decode_cursor(params.cursor, sort, order)
+        query = query.where(key < boundary if descending else key > boundary)
+    ordering = (column.desc(), model.id.desc()) if descending else (column.asc(), model.id.asc())
+    rows = (await db.scalars(query.order_by(*ordering).limit(params.limit + 1))).all()
+
+    items = rows[:params.limit]
+    has_more = len(rows) > params.limit
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor(sort, order, getattr(last, column.key), last.id)
+    return {"items": items, "next_cursor": next_cursor, "has_more": has_more}
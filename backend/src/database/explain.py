@@ -0,0 +1,105 @@
+"""Imprime o plano de execução (EXPLAIN) de cada consulta dos serviços.
+
+Uso (a partir de backend/):
+    python -m src.database.explain --email dono@exemplo.com --store-id 1 --item-id 1
+
+As consultas de leitura usam os ids informados; as de escrita rodam com
+ids inexistentes, dentro de uma transação desfeita ao final, e servem apenas
+para capturar o SQL e o plano de cada comando.
+"""
+import argparse
+import asyncio
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.dependencies import CurrentUser
+from src.core.pagination import PAGE_SIZE_DEFAULT, PageParams
+from src.database.database import async_engine
+from src.database.query_counter import count_queries
+from src.models.user import User
+from src.services.analytics_service import AnalyticsService
+from src.services.inventory_service import InventoryService
+from src.services.sale_service import SaleService
+from src.services.store_service import StoreService
+from src.services.supplier_service import SupplierService
+
+MISSING_ID = -1
+
+class _Payload:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+def service_calls(db, user, store_id, item_id):
+    stores, sales = StoreService(db), SaleService(db)
+    inventory, suppliers = InventoryService(db), SupplierService(db)
+    analytics = AnalyticsService(db)
+    inventory_payload = _Payload(store_id=MISSING_ID, fruit="-", quantity=0, unit="kg")
+    sale_payload = _Payload(store_id=MISSING_ID, fruit="-", quantity=0, value=0.0)
+    supplier_payload = _Payload(store_id=MISSING_ID, name="-", cnpj="-", address="-", fruits="")
+    page = PageParams(cursor=None, limit=PAGE_SIZE_DEFAULT, sort=None, order=None)
+    return [
+        ("StoreService.list_stores", lambda: stores.list_stores(user, page)),
+        ("StoreService.get_store", lambda: stores.get_store(store_id, user)),
+        ("StoreService.update_store", lambda: stores.update_store(MISSING_ID, {"cnpj": "-"}, user)),
+        ("StoreService.delete_store", lambda: stores.delete_store(MISSING_ID, user)),
+        ("InventoryService.create_inventory_item", lambda: inventory.create_inventory_item(inventory_payload, user)),
+        ("InventoryService.list_inventory", lambda: inventory.list_inventory(user, page)),
+        ("InventoryService.list_inventory_by_store", lambda: inventory.list_inventory_by_store(store_id, user, page)),
+        ("InventoryService.get_inventory_item", lambda: inventory.get_inventory_item(item_id, user)),
+        ("InventoryService.update_inventory_item", lambda: inventory.update_inventory_item(MISSING_ID, inventory_payload, user)),
+        ("InventoryService.delete_inventory_item", lambda: inventory.delete_inventory_item(MISSING_ID, user)),
+        ("SupplierService.create_supplier", lambda: suppliers.create_supplier(supplier_payload, user)),
+        ("SupplierService.list_suppliers", lambda: suppliers.list_suppliers(user, page)),
+        ("SupplierService.list_suppliers_by_store", lambda: suppliers.list_suppliers_by_store(store_id, user, page)),
+        ("SupplierService.get_supplier", lambda: suppliers.get_supplier(item_id, user)),
+        ("SupplierService.update_supplier", lambda: suppliers.update_supplier(MISSING_ID, supplier_payload, user)),
+        ("SupplierService.delete_supplier", lambda: suppliers.delete_supplier(MISSING_ID, user)),
+        ("SaleService.create_sale", lambda: sales.create_sale(sale_payload, user)),
+        ("SaleService.list_sales", lambda: sales.list_sales(user, page)),
+        ("SaleService.get_sale", lambda: sales.get_sale(item_id, user)),
+        ("SaleService.update_sale", lambda: sales.update_sale(MISSING_ID, sale_payload, user)),
+        ("SaleService.delete_sale", lambda: sales.delete_sale(MISSING_ID, user)),
+        ("AnalyticsService.sales_summary[store]", lambda: analytics.sales_summary(user, "store")),
+        ("AnalyticsService.sales_summary[month]", lambda: analytics.sales_summary(user, "month", store_id=store_id)),
+    ]
+
+async def explain(statement, parameters, conn):
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    result = await conn.exec_driver_sql(prefix + statement, parameters)
+    return [" | ".join(str(value) for value in row) for row in result]
+
+async def main(email, store_id, item_id):
+    async with async_engine.connect() as conn:
+        transaction = await conn.begin()
+        # Commits dos serviços viram savepoints; tudo é desfeito no final
+        db = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+        db_user = await db.scalar(select(User).where(User.email == email))
+        if not db_user:
+            raise SystemExit(f"Usuário {email} não encontrado")
+        user = CurrentUser(id=db_user.id, name=db_user.name, email=db_user.email)
+
+        for name, call in service_calls(db, user, store_id, item_id):
+            with count_queries(record_statements=True) as counter:
+                try:
+                    await call()
+                except HTTPException:
+                    pass
+            print(f"\n=== {name} ({counter.count} comando(s))")
+            for statement, parameters in zip(counter.statements, counter.parameters):
+                if statement.lstrip().upper().startswith(("SAVEPOINT", "RELEASE", "ROLLBACK")):
+                    continue
+                print(statement.strip())
+                for line in await explain(statement, parameters, conn):
+                    print(f"    {line}")
+        await db.close()
+        await transaction.rollback()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--email", required=True, help="E-mail do dono das lojas")
+    parser.add_argument("--store-id", type=int, default=1)
+    parser.add_argument("--item-id", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.email, args.store_id, args.item_id))
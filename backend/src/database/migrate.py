@@ -0,0 +1,33 @@
+import os
+import sys
+
+from alembic import command
+from alembic.config import Config
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Aplicar as migrações pendentes ao subir a API (desligar quando houver vários workers/instâncias)
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "true").lower() == "true"
+
+def alembic_config():
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    return config
+
+def upgrade_to_head():
+    command.upgrade(alembic_config(), "head")
+
+if __name__ == "__main__":
+    # python -m src.database.migrate [upgrade|downgrade|current|history] [revisão]
+    action = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    config = alembic_config()
+    if action == "upgrade":
+        command.upgrade(config, sys.argv[2] if len(sys.argv) > 2 else "head")
+    elif action == "downgrade":
+        command.downgrade(config, sys.argv[2] if len(sys.argv) > 2 else "-1")
+    elif action == "current":
+        command.current(config, verbose=True)
+    elif action == "history":
+        command.history(config)
+    else:
+        raise SystemExit(f"Ação desconhecida: {action}")
@@ -0,0 +1,75 @@
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Cabeçalho X-Query-Count em cada resposta (diagnóstico; desligado em produção por padrão)
+DB_QUERY_COUNT_HEADER = os.getenv("DB_QUERY_COUNT_HEADER", "false").lower() == "true"
+
+_current_counter = ContextVar("query_counter", default=None)
+
+
+class QueryCounter:
+    def __init__(self, record_statements=False):
+        self.count = 0
+        # Comandos e parâmetros só são guardados quando pedidos (testes, explain): uma importação
+        # em lote geraria dezenas de milhares de tuplas de parâmetros por requisição
+        self.record_statements = record_statements
+        self.statements = []
+        self.parameters = []
+
+    def record(self, statement, parameters=None):
+        self.count += 1
+        if self.record_statements:
+            self.statements.append(statement)
+            self.parameters.append(parameters)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.record(statement, parameters)
+
+@contextmanager
+def count_queries(record_statements=False):
+    """Conta os comandos SQL enviados ao banco dentro do bloco.
+
+    Uso em testes: `with count_queries() as counter: ...; assert counter.count <= 2`.
+    Com `record_statements=True` os comandos e parâmetros ficam em
+    `counter.statements` / `counter.parameters`.
+    """
+    counter = QueryCounter(record_statements)
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+class QueryCountMiddleware:
+    """Adiciona X-Query-Count às respostas HTTP.
+
+    Middleware ASGI puro: só altera a mensagem de início da resposta e não
+    envolve o corpo, então SSE, NDJSON e exportações em streaming passam
+    intactos. Em respostas em streaming o valor conta os comandos feitos
+    até o início do envio.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with count_queries() as counter:
+            async def send_with_count(message):
+                if message["type"] == "http.response.start":
+                    headers = [*message.get("headers", []), (b"x-query-count", str(counter.count).encode())]
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
@@ -0,0 +1,45 @@
+"""Recalcula a tabela de totais diários de vendas a partir da tabela sales.
+
+Uso (a partir de backend/):
+    python -m src.database.rollups
+
+Necessário apenas para preencher dados antigos ou corrigir divergências; no
+dia a dia os totais são mantidos pelo SaleService a cada venda.
+"""
+import time
+
+from sqlalchemy import delete, insert, select
+
+from src.database.database import engine
+from src.models.sale import Sale
+from src.models.sale_rollup import SaleRollup
+from src.services.analytics_service import add_rollup_delta
+
+REBUILD_FETCH_SIZE = 10000
+REBUILD_INSERT_SIZE = 1000
+
+def rebuild_rollups(connection):
+    """Apaga e recalcula os totais na transação da conexão informada."""
+    connection.execute(delete(SaleRollup))
+    totals = {}
+    # Cursor no servidor: as vendas passam em blocos, só os totais ficam em memória
+    result = connection.execution_options(yield_per=REBUILD_FETCH_SIZE).execute(
+        select(Sale.store_id, Sale.fruit, Sale.created_at, Sale.value, Sale.quantity)
+    )
+    sales = 0
+    for store_id, fruit, created_at, value, quantity in result:
+        add_rollup_delta(totals, store_id, fruit, created_at, value, quantity)
+        sales += 1
+    values = [
+        {"store_id": store_id, "fruit": fruit, "day": day, "revenue": revenue, "quantity": quantity, "sales_count": count}
+        for (store_id, fruit, day), (revenue, quantity, count) in totals.items()
+    ]
+    for start in range(0, len(values), REBUILD_INSERT_SIZE):
+        connection.execute(insert(SaleRollup), values[start:start + REBUILD_INSERT_SIZE])
+    return sales, len(values)
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        sales, rows = rebuild_rollups(connection)
+    print(f"{sales} vendas agregadas em {rows} linhas diárias em {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,55 @@
+import mimetypes
+import os
+import tarfile
+import zipfile
+
+# Tamanho máximo de cada arquivo extraído (evita bombas de descompressão)
+ML_ARCHIVE_MAX_MEMBER_BYTES = int(os.getenv("ML_ARCHIVE_MAX_MEMBER_BYTES", str(32 * 1024 * 1024)))
+
+ARCHIVE_CONTENT_TYPES = {
+    'application/zip', 'application/x-zip-compressed', 'application/x-tar',
+    'application/gzip', 'application/x-gzip', 'application/x-gtar', 'application/x-bzip2',
+}
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2')
+
+def is_archive(filename, content_type):
+    return content_type in ARCHIVE_CONTENT_TYPES or (filename or '').lower().endswith(ARCHIVE_EXTENSIONS)
+
+def _too_large(name):
+    return name, '', None, f'Arquivo maior que o limite de {ML_ARCHIVE_MAX_MEMBER_BYTES} bytes.'
+
+def iter_archive(fileobj):
+    """Percorre um ZIP ou TAR membro a membro, sem extrair tudo para a memória.
+
+    Gera tuplas (nome, content_type, bytes, erro); `erro` só é preenchido
+    quando o membro não pôde ser lido.
+    """
+    fileobj.seek(0)
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                if info.file_size > ML_ARCHIVE_MAX_MEMBER_BYTES:
+                    yield _too_large(info.filename)
+                    continue
+                yield info.filename, mimetypes.guess_type(info.filename)[0] or '', archive.read(info), None
+        return
+    fileobj.seek(0)
+    # Modo stream: o TAR (inclusive comprimido) é lido sequencialmente
+    with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            if member.size > ML_ARCHIVE_MAX_MEMBER_BYTES:
+                yield _too_large(member.name)
+                continue
+            yield member.name, mimetypes.guess_type(member.name)[0] or '', archive.extractfile(member).read(), None
+
+def iter_uploads(files):
+    if len(files) == 1 and is_archive(files[0].filename, files[0].content_type):
+        yield from iter_archive(files[0].file)
+        return
+    for file in files:
+        yield file.filename, file.content_type or '', file.file.read(), None
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import time
+from collections import deque
+
+import torch
+
+# Janela de agrupamento (ms) e tamanho máximo do lote, ajustáveis via .env
+BATCH_WINDOW_MS = float(os.getenv("ML_BATCH_WINDOW_MS", "5"))
+BATCH_MAX_SIZE = int(os.getenv("ML_BATCH_MAX_SIZE", "32"))
+
+
+class BatchMetrics:
+    def __init__(self, max_batch_size, sample_size=2048):
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.items = 0
+        # Guardamos apenas as amostras mais recentes para calcular percentis
+        self._fill_rates = deque(maxlen=sample_size)
+        self._waits = deque(maxlen=sample_size)
+
+    def record(self, batch_size, waits):
+        self.batches += 1
+        self.items += batch_size
+        self._fill_rates.append(batch_size / self.max_batch_size)
+        self._waits.extend(waits)
+
+    def snapshot(self):
+        waits = sorted(self._waits)
+
+        def percentile(p):
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(p * len(waits)))] * 1000
+
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "fill_rate": sum(self._fill_rates) / len(self._fill_rates) if self._fill_rates else 0.0,
+            "queue_wait_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": waits[-1] * 1000 if waits else 0.0,
+            },
+        }
+
+
+class MicroBatcher:
+    """Agrupa requisições concorrentes em um único forward do modelo.
+
+    Cada chamada a `submit` recebe um tensor (C, H, W); as chamadas que chegam
+    dentro da janela configurada (ou até encher o lote) são empilhadas e
+    enviadas juntas para a corrotina `predict`, que deve devolver uma linha
+    por item.
+    """
+
+    def __init__(self, predict, window_ms=BATCH_WINDOW_MS, max_batch_size=BATCH_MAX_SIZE):
+        self._predict = predict
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.metrics = BatchMetrics(max_batch_size)
+        self._queue = None
+        self._worker = None
+        self._inflight = set()
+
+    def _ensure_worker(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, tensor):
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((tensor, future, time.perf_counter()))
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            # A janela começa a contar quando o primeiro item do lote chega
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # O lote segue para inferência enquanto o próximo já é montado
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch):
+        tensors, futures, enqueued_at = zip(*batch)
+        started = time.perf_counter()
+        self.metrics.record(len(batch), [started - t for t in enqueued_at])
+        try:
+            outputs = await self._predict(torch.stack(tensors))
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, output in zip(futures, outputs):
+            # O cliente pode ter desistido (desconexão) enquanto esperava
+            if not future.done():
+                future.set_result(output)
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
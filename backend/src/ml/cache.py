@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Capacidade e validade (segundos) do cache local de resultados
+ML_CACHE_SIZE = int(os.getenv("ML_CACHE_SIZE", "2048"))
+ML_CACHE_TTL = float(os.getenv("ML_CACHE_TTL", "3600"))
+# Caminho de um arquivo SQLite compartilhado entre workers do uvicorn (opcional)
+ML_CACHE_SQLITE = os.getenv("ML_CACHE_SQLITE")
+
+def image_key(image_bytes, model_name):
+    # A versão do modelo faz parte da chave para não servir resultados de um checkpoint antigo
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    return f"{model_name}:{digest}"
+
+
+class SQLiteCacheBackend:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS classification_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM classification_cache WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO classification_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + ttl),
+        )
+
+    def purge_expired(self):
+        self._connection().execute("DELETE FROM classification_cache WHERE expires_at <= ?", (time.time(),))
+
+
+class ResultCache:
+    """Cache LRU com TTL para resultados de classificação, indexado pelo hash da imagem.
+
+    Um backend compartilhado opcional (SQLite) permite que vários workers
+    aproveitem os acertos uns dos outros; o LRU local continua na frente dele.
+    """
+
+    def __init__(self, max_size=ML_CACHE_SIZE, ttl=ML_CACHE_TTL, backend=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared_hits = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        value = self._get_local(key)
+        if value is None:
+            shared = self.backend.get(key) if self.backend is not None else None
+            value = self._record_shared(key, shared)
+        return value
+
+    def set(self, key, value):
+        self._store(key, value)
+        if self.backend is not None:
+            self.backend.set(key, value, self.ttl)
+
+    async def aget(self, key):
+        # Versão para o event loop: o acerto local responde na hora e só a consulta ao SQLite vai para uma thread
+        value = self._get_local(key)
+        if value is None:
+            shared = await asyncio.to_thread(self.backend.get, key) if self.backend is not None else None
+            value = self._record_shared(key, shared)
+        return value
+
+    async def aset(self, key, value):
+        self._store(key, value)
+        if self.backend is not None:
+            await asyncio.to_thread(self.backend.set, key, value, self.ttl)
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+            self.evictions += 1
+            return None
+
+    def _record_shared(self, key, value):
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.shared_hits += 1
+        self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+            "shared_backend": self.backend is not None,
+        }
+
+
+def build_cache():
+    backend = SQLiteCacheBackend(ML_CACHE_SQLITE) if ML_CACHE_SQLITE else None
+    return ResultCache(backend=backend)
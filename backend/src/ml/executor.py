@@ -0,0 +1,77 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import torch
+import torch.nn.functional as F
+
+from src.ml.registry import registry
+
+# Tipo do pool ("thread" ou "process"), número de workers e limite de tarefas simultâneas
+ML_EXECUTOR = os.getenv("ML_EXECUTOR", "thread")
+ML_WORKERS = int(os.getenv("ML_WORKERS", "2"))
+ML_MAX_CONCURRENCY = int(os.getenv("ML_MAX_CONCURRENCY", str(ML_WORKERS * 2)))
+# Threads do torch por processo worker (só usado no pool de processos)
+ML_TORCH_THREADS = int(os.getenv("ML_TORCH_THREADS", "1"))
+
+def _init_worker(torch_threads=None):
+    if torch_threads:
+        torch.set_num_threads(torch_threads)
+
+def load_model(model_name, model_path):
+    # Cada processo tem seu próprio registro; threads compartilham o do processo principal
+    registry.register(model_name, model_path)
+    registry.get(model_name)
+
+def run_forward(batch, model_name, model_path):
+    registry.register(model_name, model_path)
+    model = registry.get(model_name)
+    with torch.no_grad():
+        output = model(batch.to(registry.device))
+        return F.softmax(output, dim=1).cpu()
+
+
+class InferenceExecutor:
+    def __init__(self, kind=ML_EXECUTOR, workers=ML_WORKERS, max_concurrency=ML_MAX_CONCURRENCY):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"ML_EXECUTOR inválido: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self._pool = None
+        self._semaphore = None
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(ML_TORCH_THREADS,),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="ml-inference",
+                )
+        return self._pool
+
+    async def run(self, fn, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._ensure_pool(), fn, *args)
+
+    async def warmup(self, name=None):
+        # Uma tarefa por worker para que cada um carregue e aqueça o modelo antes do tráfego real
+        name = name or registry.active
+        path = registry.path_for(name)
+        await asyncio.gather(*(self.run(load_model, name, path) for _ in range(self.workers)))
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
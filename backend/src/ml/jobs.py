@@ -0,0 +1,163 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Arquivo SQLite da fila de classificação (persistente entre reinícios), fora da árvore de código
+ML_JOBS_DB = os.getenv("ML_JOBS_DB", os.path.join(BACKEND_DIR, "var", "jobs.sqlite3"))
+ML_JOBS_MAX_ATTEMPTS = int(os.getenv("ML_JOBS_MAX_ATTEMPTS", "3"))
+# Tempo (s) após o qual um job "running" sem resposta volta para a fila (worker morreu)
+ML_JOBS_LEASE_SECONDS = float(os.getenv("ML_JOBS_LEASE_SECONDS", "300"))
+ML_JOBS_RETRY_BACKOFF = float(os.getenv("ML_JOBS_RETRY_BACKOFF", "2"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobQueue:
+    """Fila persistente de jobs de classificação com prioridade e novas tentativas.
+
+    Vários processos podem consumir o mesmo arquivo: a reserva de um job é
+    feita dentro de uma transação `BEGIN IMMEDIATE`.
+    """
+
+    def __init__(self, path=ML_JOBS_DB, max_attempts=ML_JOBS_MAX_ATTEMPTS,
+                 lease_seconds=ML_JOBS_LEASE_SECONDS, retry_backoff=ML_JOBS_RETRY_BACKOFF):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.retry_backoff = retry_backoff
+        self._local = threading.local()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS classification_jobs ("
+            "id TEXT PRIMARY KEY, owner_id INTEGER, status TEXT NOT NULL, priority INTEGER NOT NULL DEFAULT 0, "
+            "attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL, "
+            "filename TEXT, content_type TEXT, payload BLOB, result TEXT, error TEXT, "
+            "available_at REAL NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        # Arquivos criados antes do dono ser gravado: jobs antigos ficam sem dono e não são mais consultáveis
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(classification_jobs)")}
+        if "owner_id" not in columns:
+            conn.execute("ALTER TABLE classification_jobs ADD COLUMN owner_id INTEGER")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_classification_jobs_pending "
+            "ON classification_jobs (status, priority DESC, created_at)"
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def submit(self, payload, filename=None, content_type=None, priority=0, max_attempts=None, owner_id=None):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connection().execute(
+            "INSERT INTO classification_jobs (id, owner_id, status, priority, max_attempts, filename, content_type, "
+            "payload, available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, owner_id, QUEUED, priority, max_attempts or self.max_attempts, filename, content_type,
+             payload, now, now, now),
+        )
+        return job_id
+
+    def claim(self):
+        conn = self._connection()
+        now = time.time()
+        expired = now - self.lease_seconds
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Lease vencido sem tentativas restantes: o job derrubou o worker em todas elas
+            conn.execute(
+                "UPDATE classification_jobs SET status = ?, error = ?, payload = NULL, updated_at = ? "
+                "WHERE status = ? AND updated_at <= ? AND attempts >= max_attempts",
+                (FAILED, "O processamento foi interrompido em todas as tentativas", now, RUNNING, expired),
+            )
+            row = conn.execute(
+                "SELECT id, payload, filename, content_type, attempts FROM classification_jobs "
+                "WHERE (status = ? AND available_at <= ?) "
+                "OR (status = ? AND updated_at <= ? AND attempts < max_attempts) "
+                "ORDER BY priority DESC, created_at LIMIT 1",
+                (QUEUED, now, RUNNING, expired),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE classification_jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (RUNNING, now, row["id"]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return dict(row) if row is not None else None
+
+    def complete(self, job_id, result):
+        # O payload não é mais necessário depois do resultado gravado
+        self._connection().execute(
+            "UPDATE classification_jobs SET status = ?, result = ?, error = NULL, payload = NULL, updated_at = ? "
+            "WHERE id = ?",
+            (DONE, json.dumps(result), time.time(), job_id),
+        )
+
+    def fail(self, job_id, error, retryable=True):
+        # retryable=False para erros determinísticos (ex.: imagem inválida): repetir não muda o resultado
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            "SELECT attempts, max_attempts FROM classification_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return
+        if retryable and row["attempts"] < row["max_attempts"]:
+            # Backoff exponencial entre as tentativas
+            delay = self.retry_backoff ** row["attempts"]
+            conn.execute(
+                "UPDATE classification_jobs SET status = ?, error = ?, available_at = ?, updated_at = ? WHERE id = ?",
+                (QUEUED, error, now + delay, now, job_id),
+            )
+        else:
+            conn.execute(
+                "UPDATE classification_jobs SET status = ?, error = ?, payload = NULL, updated_at = ? WHERE id = ?",
+                (FAILED, error, now, job_id),
+            )
+
+    def get(self, job_id, owner_id=None):
+        # Com owner_id, o job de outro usuário é tratado como inexistente
+        query = (
+            "SELECT id, status, priority, attempts, max_attempts, filename, result, error, created_at, updated_at "
+            "FROM classification_jobs WHERE id = ?"
+        )
+        params = (job_id,)
+        if owner_id is not None:
+            query += " AND owner_id = ?"
+            params += (owner_id,)
+        row = self._connection().execute(query, params).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def stats(self):
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        for status, count in self._connection().execute(
+            "SELECT status, COUNT(*) FROM classification_jobs GROUP BY status"
+        ):
+            counts[status] = count
+        oldest = self._connection().execute(
+            "SELECT MIN(created_at) FROM classification_jobs WHERE status = ?", (QUEUED,)
+        ).fetchone()[0]
+        return {
+            **counts,
+            "depth": counts[QUEUED] + counts[RUNNING],
+            "oldest_queued_age_seconds": time.time() - oldest if oldest else 0.0,
+        }
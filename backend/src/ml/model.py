@@ -15,7 +15,8 @@ class Net(nn.Module):
     def forward(self, x):
         out = F.max_pool2d(torch.tanh(self.conv1(x)), 2)
         out = F.max_pool2d(torch.tanh(self.conv2(out)), 2)
-        out = out.view(-1, 8 * 8 * 8)
+        # reshape, não view: a saída das variantes quantizadas (conv/max_pool int8) pode não ser contígua
+        out = out.reshape(-1, 8 * 8 * 8)
         out = torch.tanh(self.fc1(out))
         out = self.fc2(out)
         return out
@@ -0,0 +1,64 @@
+import io
+import os
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+import torchvision.transforms as transforms
+from PIL import Image, UnidentifiedImageError
+
+MEAN = (0.7369, 0.6360, 0.5318)
+STD = (0.3281, 0.3417, 0.3704)
+INPUT_SIZE = 32
+
+# Caminho rápido (decodificação reduzida + normalização vetorizada); "false" volta ao pipeline do torchvision
+ML_FAST_PREPROCESS = os.getenv("ML_FAST_PREPROCESS", "true").lower() == "true"
+
+transform = transforms.Compose([
+    transforms.Resize((INPUT_SIZE, INPUT_SIZE)),
+    transforms.ToTensor(),
+    transforms.Normalize(MEAN, STD)
+])
+
+# Erros do PIL ao abrir/decodificar bytes inválidos, truncados ou grandes demais
+DECODE_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError, SyntaxError)
+
+class InvalidImageError(ValueError):
+    """Os bytes enviados não são uma imagem que possa ser decodificada."""
+
+# (x / 255 - mean) / std reescrito como x * scale + shift, aplicado em uma única operação
+_SCALE = torch.tensor([1 / (255 * s) for s in STD]).view(3, 1, 1)
+_SHIFT = torch.tensor([-m / s for m, s in zip(MEAN, STD)]).view(3, 1, 1)
+
+def decode_image(image_bytes, size=INPUT_SIZE):
+    img = Image.open(io.BytesIO(image_bytes))
+    # Em JPEGs o decodificador já entrega a imagem reduzida (1/2, 1/4 ou 1/8), mantendo
+    # pelo menos o dobro da resolução final para o antialias do redimensionamento
+    img.draft('RGB', (size * 2, size * 2))
+    return img.convert('RGB')
+
+def to_input_tensor(img, size=INPUT_SIZE):
+    pixels = torch.from_numpy(np.array(img, dtype=np.uint8)).permute(2, 0, 1).unsqueeze(0).float()
+    resized = F.interpolate(pixels, size=(size, size), mode='bilinear', antialias=True, align_corners=False)
+    return torch.addcmul(_SHIFT, resized[0], _SCALE)
+
+def fast_image_tensor(image_bytes, size=INPUT_SIZE):
+    return to_input_tensor(decode_image(image_bytes, size), size)
+
+def tile_image_tensor(image_bytes, grid, overlap, size=INPUT_SIZE):
+    # Janelas de `size` px com passo `step`: a imagem é redimensionada para caber exatamente grid x grid janelas
+    step = max(1, round(size * (1 - overlap)))
+    canvas = size + (grid - 1) * step
+    image = to_input_tensor(decode_image(image_bytes, canvas), canvas)
+    # (C, H, W) -> (C, grid, grid, size, size) -> (grid * grid, C, size, size), sem laço em Python
+    tiles = image.unfold(1, size, step).unfold(2, size, step)
+    return tiles.permute(1, 2, 0, 3, 4).reshape(grid * grid, 3, size, size).contiguous()
+
+def reference_image_tensor(image_bytes):
+    img = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+    return transform(img)
+
+def load_image_tensor(image_bytes):
+    if ML_FAST_PREPROCESS:
+        return fast_image_tensor(image_bytes)
+    return reference_image_tensor(image_bytes)
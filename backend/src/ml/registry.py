@@ -0,0 +1,133 @@
+import os
+import re
+import threading
+
+import torch
+
+from src.ml.model import Net
+from src.ml.variants import CPU_ONLY_VARIANTS, ML_VARIANT, build_variant
+
+# "auto" escolhe CUDA quando disponível; também aceita "cpu", "cuda", "cuda:1"...
+ML_DEVICE = os.getenv("ML_DEVICE", "auto")
+ML_WARMUP_ITERATIONS = int(os.getenv("ML_WARMUP_ITERATIONS", "3"))
+# Versões extras do checkpoint, no formato "nome=caminho,nome2=caminho2"
+ML_MODELS = os.getenv("ML_MODELS", "")
+ML_ACTIVE_MODEL = os.getenv("ML_ACTIVE_MODEL", "default")
+# Diretório onde novos checkpoints (<nome>.pt) podem ser colocados para troca a quente
+ML_MODELS_DIR = os.getenv("ML_MODELS_DIR", os.path.dirname(__file__))
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'FreshnessDetector.pt')
+
+_VALID_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+def resolve_device(preference=ML_DEVICE):
+    if preference == "auto":
+        return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    return torch.device(preference)
+
+
+class ModelRegistry:
+    """Mantém as versões do `Net` endereçáveis por nome.
+
+    Os pesos só são carregados no primeiro uso (ou em `get` chamado por um
+    hook de inicialização) e passam por alguns forwards de aquecimento antes
+    de atender requisições reais.
+    """
+
+    def __init__(self, device=None, warmup_iterations=ML_WARMUP_ITERATIONS, models_dir=ML_MODELS_DIR, variant=ML_VARIANT):
+        self.variant = variant
+        # Variantes quantizadas e ONNX só rodam em CPU
+        self.device = device or resolve_device("cpu" if variant in CPU_ONLY_VARIANTS else ML_DEVICE)
+        self.warmup_iterations = warmup_iterations
+        self.models_dir = models_dir
+        self.active = None
+        self._paths = {}
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self._paths
+
+    def register(self, name, path):
+        with self._lock:
+            if self._paths.get(name) != path:
+                self._paths[name] = path
+                # Um novo caminho para o mesmo nome invalida a versão carregada
+                self._models.pop(name, None)
+        if self.active is None:
+            self.active = name
+
+    def path_for(self, name):
+        if name not in self._paths:
+            candidate = os.path.join(self.models_dir, f"{name}.pt")
+            if not _VALID_NAME.match(name) or not os.path.isfile(candidate):
+                raise KeyError(f"Modelo '{name}' não encontrado")
+            self.register(name, candidate)
+        return self._paths[name]
+
+    def get(self, name=None):
+        name = name or self.active
+        model = self._models.get(name)
+        if model is None:
+            path = self.path_for(name)
+            with self._lock:
+                model = self._models.get(name)
+                if model is None:
+                    model = self._load(path)
+                    self._models[name] = model
+        return model
+
+    def activate(self, name):
+        # Carrega e aquece a nova versão antes de trocar, sem derrubar requisições em andamento
+        self.get(name)
+        self.active = name
+
+    def unload(self, name):
+        with self._lock:
+            self._models.pop(name, None)
+
+    def describe(self):
+        return {
+            "device": str(self.device),
+            "variant": self.variant,
+            "active": self.active,
+            "models": [
+                {"name": name, "path": path, "loaded": name in self._models}
+                for name, path in self._paths.items()
+            ],
+        }
+
+    def _load(self, path):
+        model = Net()
+        model.load_state_dict(torch.load(path, map_location=self.device))
+        model.to(self.device)
+        model = build_variant(model.eval(), self.variant)
+        self._warmup(model)
+        return model
+
+    def _warmup(self, model):
+        example = torch.zeros(1, 3, 32, 32, device=self.device)
+        with torch.no_grad():
+            for _ in range(self.warmup_iterations):
+                model(example)
+
+
+def build_registry():
+    registry = ModelRegistry()
+    registry.register("default", DEFAULT_MODEL_PATH)
+    for entry in filter(None, (e.strip() for e in ML_MODELS.split(","))):
+        name, path = entry.split("=", 1)
+        registry.register(name.strip(), path.strip())
+    # Procura também ML_MODELS_DIR/<nome>.pt; um nome desconhecido é erro de configuração, não "default"
+    try:
+        registry.path_for(ML_ACTIVE_MODEL)
+    except KeyError:
+        raise ValueError(
+            f"ML_ACTIVE_MODEL inválido: {ML_ACTIVE_MODEL}. Registre-o em ML_MODELS "
+            f"ou coloque {ML_ACTIVE_MODEL}.pt em {registry.models_dir}"
+        )
+    registry.active = ML_ACTIVE_MODEL
+    return registry
+
+# Instância do processo; nada é carregado até o primeiro uso
+registry = build_registry()
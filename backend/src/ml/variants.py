@@ -0,0 +1,110 @@
+import copy
+import inspect
+import io
+import os
+
+import torch
+import torch.nn as nn
+
+# Variante de execução do Net escolhida na inicialização
+ML_VARIANT = os.getenv("ML_VARIANT", "eager")
+# Pasta de imagens para calibrar a quantização estática (opcional; sem ela usamos entradas sintéticas)
+ML_CALIBRATION_DIR = os.getenv("ML_CALIBRATION_DIR")
+
+VARIANTS = ("eager", "int8_dynamic", "int8_static", "torchscript", "onnx")
+# Variantes que só rodam em CPU
+CPU_ONLY_VARIANTS = ("int8_dynamic", "int8_static", "onnx")
+
+def _example_input(batch_size=1):
+    return torch.zeros(batch_size, 3, 32, 32)
+
+def calibration_batches(calibration_dir=ML_CALIBRATION_DIR, batch_size=32, limit=512):
+    if calibration_dir and os.path.isdir(calibration_dir):
+        from src.ml.preprocessing import load_image_tensor
+        tensors = []
+        for name in sorted(os.listdir(calibration_dir))[:limit]:
+            try:
+                with open(os.path.join(calibration_dir, name), 'rb') as f:
+                    tensors.append(load_image_tensor(f.read()))
+            except Exception:
+                continue
+        for start in range(0, len(tensors), batch_size):
+            yield torch.stack(tensors[start:start + batch_size])
+        return
+    # Entradas já normalizadas ficam aproximadamente em N(0, 1)
+    generator = torch.Generator().manual_seed(0)
+    for _ in range(8):
+        yield torch.randn(batch_size, 3, 32, 32, generator=generator)
+
+def quantize_dynamic(model):
+    return torch.ao.quantization.quantize_dynamic(copy.deepcopy(model), {nn.Linear}, dtype=torch.qint8)
+
+def quantize_static(model, batches=None):
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    prepared = prepare_fx(copy.deepcopy(model), get_default_qconfig_mapping("x86"), (_example_input(),))
+    with torch.no_grad():
+        for batch in batches if batches is not None else calibration_batches():
+            prepared(batch)
+    return convert_fx(prepared)
+
+def torchscript(model):
+    example = _example_input().to(next(model.parameters()).device)
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example)
+    return torch.jit.optimize_for_inference(torch.jit.freeze(traced.eval()))
+
+
+class OnnxRuntimeModel:
+    """Executa o Net exportado para ONNX no onnxruntime, com a mesma interface de um módulo."""
+
+    def __init__(self, model):
+        import onnxruntime
+
+        buffer = io.BytesIO()
+        options = {}
+        # Nas versões recentes do torch o exportador padrão é o dynamo (exige onnxscript e trata
+        # dynamic_axes de outro jeito); o exportador por trace mantém o lote dinâmico
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+            options["dynamo"] = False
+        torch.onnx.export(
+            model, _example_input(), buffer,
+            input_names=["input"], output_names=["logits"],
+            dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+            **options,
+        )
+        self.onnx_bytes = buffer.getvalue()
+        self.session = onnxruntime.InferenceSession(self.onnx_bytes, providers=["CPUExecutionProvider"])
+
+    def __call__(self, batch):
+        logits = self.session.run(None, {"input": batch.detach().cpu().numpy()})[0]
+        return torch.from_numpy(logits)
+
+    def eval(self):
+        return self
+
+
+def build_variant(model, variant=ML_VARIANT):
+    if variant not in VARIANTS:
+        raise ValueError(f"ML_VARIANT inválido: {variant}. Opções: {', '.join(VARIANTS)}")
+    model.eval()
+    if variant == "eager":
+        return model
+    if variant == "int8_dynamic":
+        return quantize_dynamic(model)
+    if variant == "int8_static":
+        return quantize_static(model)
+    if variant == "torchscript":
+        return torchscript(model)
+    return OnnxRuntimeModel(model)
+
+def serialized_size(model):
+    if isinstance(model, OnnxRuntimeModel):
+        return len(model.onnx_bytes)
+    buffer = io.BytesIO()
+    if isinstance(model, torch.jit.ScriptModule):
+        torch.jit.save(model, buffer)
+    else:
+        torch.save(model.state_dict(), buffer)
+    return buffer.tell()
@@ -1,5 +1,13 @@
-from sqlalchemy import Column, String
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+def as_utc(value):
+    # Datas sem fuso vindas da API são interpretadas como UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
 
 class BaseEntity:
-    created_at = Column(String)
-    updated_at = Column(String) 
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from src.database.database import Base
 from src.models.base_entity import BaseEntity
 
 class Inventory(BaseEntity, Base):
     __tablename__ = "inventory"
+    # Uma fruta por loja; também atende às buscas por (store_id, fruit)
+    __table_args__ = (UniqueConstraint("store_id", "fruit", name="uq_inventory_store_fruit"),)
 
     id = Column(Integer, primary_key=True, index=True)
     fruit = Column(String, nullable=False)
@@ -1,5 +1,5 @@
 from src.models.inventory import Inventory
-from datetime import datetime
+from src.models.base_entity import utcnow
 
 class InventoryFactory:
     @staticmethod
@@ -9,6 +9,6 @@ class InventoryFactory:
             quantity=inventory_data.quantity,
             unit=inventory_data.unit,
             store_id=store_id,
-            created_at=datetime.now().isoformat(),
-            updated_at=datetime.now().isoformat()
+            created_at=utcnow(),
+            updated_at=utcnow()
         ) 
\ No newline at end of file
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from src.database.database import Base
+from src.models.base_entity import BaseEntity, utcnow
+
+class Notification(BaseEntity, Base):
+    """E-mail pendente gravado na mesma transação da operação que o gerou (outbox)."""
+    __tablename__ = "notification_outbox"
+    # O despachante busca por status e horário da próxima tentativa
+    __table_args__ = (Index("ix_notification_outbox_status_next_attempt_at", "status", "next_attempt_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    kind = Column(String, nullable=False)  # e.g., 'sale', 'low_stock'
+    # Sem chave estrangeira: a notificação sobrevive à exclusão da loja
+    store_id = Column(Integer)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    sent_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
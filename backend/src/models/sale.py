@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from src.database.database import Base
 from src.models.base_entity import BaseEntity
 
 class Sale(BaseEntity, Base):
     __tablename__ = "sales"
+    # Vendas por loja e período; também cobre as buscas só por store_id
+    __table_args__ = (Index("ix_sales_store_id_created_at", "store_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     value = Column(Float, nullable=False)
@@ -1,5 +1,5 @@
 from src.models.sale import Sale
-from datetime import datetime
+from src.models.base_entity import utcnow
 
 class SaleFactory:
     @staticmethod
@@ -8,7 +8,7 @@ class SaleFactory:
             value=sale_data.value,
             quantity=sale_data.quantity,
             fruit=sale_data.fruit,
-            created_at=datetime.now().isoformat(),
-            updated_at=datetime.now().isoformat(),
+            created_at=utcnow(),
+            updated_at=utcnow(),
             store_id=store_id
         ) 
\ No newline at end of file
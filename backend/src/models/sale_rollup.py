@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Date, Float, Integer, String
+from src.database.database import Base
+
+class SaleRollup(Base):
+    """Totais diários de vendas por loja e fruta, mantidos pelo SaleService a cada venda."""
+    __tablename__ = "sales_daily_rollup"
+
+    # A chave (store_id, fruit, day) também atende aos filtros por loja e período
+    store_id = Column(Integer, primary_key=True)
+    fruit = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    revenue = Column(Float, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    sales_count = Column(Integer, nullable=False, default=0)
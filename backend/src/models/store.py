@@ -17,7 +17,7 @@ class Store(BaseEntity, Base):
     _phone = Column("phone", String)
     _email = Column("email", String)
     # created_at e updated_at agora vêm da BaseEntity
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     user = relationship("User", back_populates="stores")
     sales = relationship("Sale", back_populates="store")
     inventory = relationship("Inventory", back_populates="store")
@@ -1,5 +1,5 @@
 from src.models.store import Store
-from datetime import datetime
+from src.models.base_entity import utcnow
 
 class StoreFactory:
     @staticmethod
@@ -7,6 +7,6 @@ class StoreFactory:
         return Store(
             **store_data,
             user_id=user_id,
-            created_at=datetime.now().isoformat(),
-            updated_at=datetime.now().isoformat()
+            created_at=utcnow(),
+            updated_at=utcnow()
         ) 
\ No newline at end of file
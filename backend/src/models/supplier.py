@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 from src.database.database import Base
 from src.models.base_entity import BaseEntity
 
 class Supplier(BaseEntity, Base):
     __tablename__ = "suppliers"
+    __table_args__ = (UniqueConstraint("store_id", "cnpj", name="uq_suppliers_store_cnpj"),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -1,5 +1,5 @@
 from src.models.supplier import Supplier
-from datetime import datetime
+from src.models.base_entity import utcnow
 
 class SupplierFactory:
     @staticmethod
@@ -10,6 +10,6 @@ class SupplierFactory:
             address=supplier_data.address,
             fruits=supplier_data.fruits,
             store_id=store_id,
-            created_at=datetime.now().isoformat(),
-            updated_at=datetime.now().isoformat()
+            created_at=utcnow(),
+            updated_at=utcnow()
         ) 
\ No newline at end of file
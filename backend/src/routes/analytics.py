@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from datetime import date
+from pydantic import BaseModel
+from src.database.database import get_async_db
+from src.core.dependencies import CurrentUser, get_current_user
+from src.services.analytics_service import AnalyticsService
+
+class SalesTotals(BaseModel):
+    revenue: float
+    quantity: int
+    count: int
+
+class SalesSummaryItem(SalesTotals):
+    # id da loja, nome da fruta, dia/início da semana (ISO) ou mês (AAAA-MM)
+    key: Union[int, str]
+
+class SalesSummaryResponse(BaseModel):
+    group_by: str
+    items: List[SalesSummaryItem]
+    total: SalesTotals
+
+router = APIRouter()
+
+# Receita, quantidade e número de vendas agrupados por loja, fruta, dia, semana ou mês, no período [date_from, date_to)
+@router.get("/analytics/sales", response_model=SalesSummaryResponse)
+async def sales_summary(
+    group_by: str = Query("day"),
+    store_id: Optional[int] = Query(None),
+    fruit: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return await AnalyticsService(db).sales_summary(
+        current_user, group_by, store_id=store_id, fruit=fruit, date_from=date_from, date_to=date_to
+    )
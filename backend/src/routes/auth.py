@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Request, HTTPException, Depends, status, Response, Cookie
 from fastapi.responses import RedirectResponse, JSONResponse
 from authlib.integrations.starlette_client import OAuth
-from sqlalchemy.orm import Session
-from src.database.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.database import get_async_db
 from src.models.user import User
 from src.core.security import create_access_token, verify_token
+from src.core.dependencies import CurrentUser, auth_cache, get_admin_user
 import os
 from dotenv import load_dotenv
 from datetime import timedelta
@@ -36,7 +38,7 @@ async def login_google(request: Request):
     return await oauth.google.authorize_redirect(request, REDIRECT_URI)
 
 @router.get("/auth/google")
-async def auth_google(request: Request, db: Session = Depends(get_db)):
+async def auth_google(request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
         token = await oauth.google.authorize_access_token(request)
         user = token.get("userinfo")
@@ -48,14 +50,13 @@ async def auth_google(request: Request, db: Session = Depends(get_db)):
         print(f"Usuário autenticado - Email: {email}, Nome: {name}")
 
         # Verificar se o usuário já existe no banco
-        db_user = db.query(User).filter(User.email == email).first()
+        db_user = await db.scalar(select(User).where(User.email == email))
         
         if not db_user:
             # Criar novo usuário
             db_user = User(email=email, name=name)
             db.add(db_user)
-            db.commit()
-            db.refresh(db_user)
+            await db.commit()
             print("Novo usuário criado no banco de dados")
         else:
             print("Usuário existente encontrado no banco de dados")
@@ -108,6 +109,10 @@ async def verify_session(request: Request):
         print(f"Erro ao verificar sessão: {str(e)}")
         return JSONResponse({"authenticated": False})
 
+@router.get("/auth/cache-stats")
+async def auth_cache_stats(admin: CurrentUser = Depends(get_admin_user)):
+    return auth_cache.stats()
+
 @router.post("/logout")
 async def logout(response: Response):
     response.delete_cookie(
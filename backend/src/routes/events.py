@@ -0,0 +1,42 @@
+import json
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.database import get_async_db
+from src.core.dependencies import CurrentUser, get_current_user
+from src.core.events import EVENTS_HEARTBEAT_SECONDS, broker
+
+router = APIRouter()
+
+# Alterações de vendas, estoque e fornecedores das lojas do usuário, por Server-Sent Events
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    # Conexão longa: a sessão do banco volta ao pool antes de começar a transmitir
+    await db.close()
+    subscription = broker.subscribe(current_user.id)
+
+    async def stream():
+        try:
+            # Intervalo de reconexão do EventSource (ms)
+            yield "retry: 3000\n\n"
+            while True:
+                event = await subscription.get(EVENTS_HEARTBEAT_SECONDS)
+                if event is None:
+                    if await request.is_disconnected():
+                        return
+                    # Comentário SSE: mantém proxies e o navegador com a conexão aberta
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import datetime
+from src.database.database import get_async_db
+from src.core.dependencies import CurrentUser, get_current_user
+from src.services.export_service import ensure_store_owned, export_stream
+
+router = APIRouter()
+
+def _response(chunks, media_type, filename):
+    return StreamingResponse(
+        chunks, media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# Exportação completa das vendas em CSV ou Parquet, lida em blocos direto do banco (memória constante)
+@router.get("/exports/sales")
+async def export_sales(
+    format: str = Query("csv"),
+    gzip: bool = Query(False),
+    store_id: Optional[int] = Query(None),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    await ensure_store_owned(db, store_id, current_user)
+    return _response(*export_stream(
+        "sales", current_user, format, gzip, store_id=store_id, date_from=date_from, date_to=date_to
+    ))
+
+@router.get("/exports/inventory")
+async def export_inventory(
+    format: str = Query("csv"),
+    gzip: bool = Query(False),
+    store_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    await ensure_store_owned(db, store_id, current_user)
+    return _response(*export_stream("inventory", current_user, format, gzip, store_id=store_id))
+
+@router.get("/exports/suppliers")
+async def export_suppliers(
+    format: str = Query("csv"),
+    gzip: bool = Query(False),
+    store_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    await ensure_store_owned(db, store_id, current_user)
+    return _response(*export_stream("suppliers", current_user, format, gzip, store_id=store_id))
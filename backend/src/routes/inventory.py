@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, status, Cookie
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date, datetime
 from pydantic import BaseModel
 
-from src.database.database import get_db
-from src.models.user import User
-from src.core.security import verify_token
+from src.database.database import get_async_db
+from src.core.dependencies import CurrentUser, get_current_user
+from src.core.pagination import Page, PageParams
+from src.core.bulk import BulkRowError, parse_bulk_body, validate_rows
 from src.services.inventory_service import InventoryService
+from src.services.forecast_service import ForecastService
 
 # Pydantic Models
 class InventoryBase(BaseModel):
@@ -24,66 +27,120 @@ class InventoryUpdate(BaseModel):
 class InventoryResponse(InventoryBase):
     id: int
     store_id: int
-    created_at: str
-    updated_at: str
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
 
     class Config:
         from_attributes = True
 
-router = APIRouter()
+class BulkInventoryResult(BaseModel):
+    row: int
+    store_id: int
+    fruit: str
+    quantity: int
+
+class BulkInventoryResponse(BaseModel):
+    applied: int
+    results: List[BulkInventoryResult]
+    errors: List[BulkRowError]
+
+class ReorderSuggestion(BaseModel):
+    store_id: int
+    fruit: str
+    unit: str
+    on_hand: int
+    moving_average: float
+    daily_forecast: float
+    lead_time_demand: float
+    safety_stock: float
+    reorder_point: float
+    suggested_quantity: int
+    days_of_cover: Optional[float]
 
-# Dependency to get current user (similar to other routes)
-async def get_current_user(access_token: str = Cookie(None), db: Session = Depends(get_db)):
-    # This logic is repeated, could be moved to a shared dependency file
-    if not access_token:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
-    try:
-        payload = verify_token(access_token)
-        user = db.query(User).filter(User.email == payload["sub"]).first()
-        if not user:
-            raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
-        return user
-    except Exception:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
+class ReorderSuggestionsResponse(BaseModel):
+    generated_for: date
+    lead_time_days: int
+    review_days: int
+    items: List[ReorderSuggestion]
+
+router = APIRouter()
 
 @router.post("/inventory/", response_model=InventoryResponse, status_code=status.HTTP_201_CREATED)
 async def create_inventory_item(
     inventory_data: InventoryCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return await InventoryService(db).create_inventory_item(inventory_data, current_user)
+
+# Importar contagem de estoque em lote (JSON, NDJSON ou CSV com colunas store_id, fruit, quantity, unit).
+# mode=set substitui a quantidade; mode=delta soma (ou subtrai) à quantidade atual.
+@router.post("/inventory/bulk", response_model=BulkInventoryResponse)
+async def upsert_inventory_bulk(
+    request: Request,
+    mode: str = Query("set"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return InventoryService(db).create_inventory_item(inventory_data, current_user)
+    rows = parse_bulk_body(await request.body(), request.headers.get("content-type"))
+    valid, errors = validate_rows(rows, InventoryCreate)
+    report = await InventoryService(db).upsert_inventory_bulk(valid, mode, current_user)
+    report["errors"] = sorted(errors + report["errors"], key=lambda error: error["row"])
+    return report
 
-@router.get("/inventory/store/{store_id}", response_model=List[InventoryResponse])
+# Estoque de todas as lojas do usuário; ?store_id= pode ser repetido para filtrar lojas
+@router.get("/inventory/", response_model=Page[InventoryResponse])
+async def list_inventory(
+    page: PageParams = Depends(),
+    store_id: Optional[List[int]] = Query(None),
+    fruit: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return await InventoryService(db).list_inventory(current_user, page, store_ids=store_id, fruit=fruit)
+
+@router.get("/inventory/store/{store_id}", response_model=Page[InventoryResponse])
 async def list_inventory_for_store(
     store_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    page: PageParams = Depends(),
+    fruit: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return await InventoryService(db).list_inventory_by_store(store_id, current_user, page, fruit=fruit)
+
+# Sugestões de reposição por (loja, fruta) a partir da previsão de demanda; all=true inclui itens sem necessidade
+@router.get("/inventory/reorder-suggestions", response_model=ReorderSuggestionsResponse)
+async def reorder_suggestions(
+    store_id: Optional[int] = Query(None),
+    include_all: bool = Query(False, alias="all"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return InventoryService(db).list_inventory_by_store(store_id, current_user)
+    return await ForecastService(db).reorder_suggestions(current_user, store_id=store_id, only_needed=not include_all)
 
 @router.get("/inventory/{item_id}", response_model=InventoryResponse)
 async def get_inventory_item(
     item_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return InventoryService(db).get_inventory_item(item_id, current_user)
+    return await InventoryService(db).get_inventory_item(item_id, current_user)
 
 @router.put("/inventory/{item_id}", response_model=InventoryResponse)
 async def update_inventory_item(
     item_id: int,
     inventory_data: InventoryUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return InventoryService(db).update_inventory_item(item_id, inventory_data, current_user)
+    return await InventoryService(db).update_inventory_item(item_id, inventory_data, current_user)
 
 @router.delete("/inventory/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_inventory_item(
     item_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    InventoryService(db).delete_inventory_item(item_id, current_user)
+    await InventoryService(db).delete_inventory_item(item_id, current_user)
     return None 
\ No newline at end of file
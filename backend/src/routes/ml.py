@@ -1,31 +1,123 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
-from PIL import Image
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List
+import asyncio
+import itertools
+import json
 import torch
-import torch.nn.functional as F
-import torchvision.transforms as transforms
-import io
 import os
 
-# Importar a classe Net do modelo
-from src.ml.model import Net
+from src.ml.archives import iter_uploads
+from src.ml.batcher import MicroBatcher
+from src.ml.cache import build_cache, image_key
+from src.ml.jobs import JobQueue, DONE, FAILED
+from src.ml.executor import InferenceExecutor, run_forward
+from src.ml.preprocessing import DECODE_ERRORS, InvalidImageError, load_image_tensor, tile_image_tensor
+from src.ml.registry import registry
+from src.core.dependencies import CurrentUser, get_admin_user, get_current_user
+
+# Carregar e aquecer o modelo na inicialização em vez de no primeiro request
+ML_PRELOAD = os.getenv("ML_PRELOAD", "true").lower() == "true"
+# Workers em segundo plano que consomem a fila de jobs e intervalo de consulta quando ela está vazia
+ML_JOB_WORKERS = int(os.getenv("ML_JOB_WORKERS", "2"))
+ML_JOBS_POLL_INTERVAL = float(os.getenv("ML_JOBS_POLL_INTERVAL", "0.5"))
 
 router = APIRouter()
 
-# Carregar modelo e transform apenas uma vez
-model_path = os.path.join(os.path.dirname(__file__), '../ml/FreshnessDetector.pt')
-model = Net()
-model.load_state_dict(torch.load(model_path, map_location='cuda'))
-model.eval()
+classes = ['Normal', 'Podre']
 
-transform = transforms.Compose([
-    transforms.Resize((32, 32)),
-    transforms.ToTensor(),
-    transforms.Normalize((0.7369, 0.6360, 0.5318),
-                         (0.3281, 0.3417, 0.3704))
-])
+# Decodificação e inferência rodam fora do event loop; cada worker carrega o modelo uma vez
+executor = InferenceExecutor()
 
-classes = ['Normal', 'Podre']
+async def predict(batch):
+    # O nome e o caminho vão junto para que workers em outros processos sigam a troca de versão
+    name = registry.active
+    return await executor.run(run_forward, batch, name, registry.path_for(name))
+
+# Agrupa requisições simultâneas em um único forward do modelo
+batcher = MicroBatcher(predict)
+
+# Resultados por hash da imagem: reenvios da mesma foto não passam pelo modelo
+result_cache = build_cache()
+
+def to_result(prob):
+    pred = int(torch.argmax(prob))
+    return {
+        'classe': classes[pred],
+        'probabilidade': float(prob[pred])
+    }
+
+async def classify_bytes(image_bytes):
+    cache_key = image_key(image_bytes, registry.active)
+    result = await result_cache.aget(cache_key)
+    if result is None:
+        try:
+            img_tensor = await executor.run(load_image_tensor, image_bytes)
+        except DECODE_ERRORS as e:
+            raise InvalidImageError(str(e)) from e
+        prob = await batcher.submit(img_tensor)
+        result = to_result(prob)
+        await result_cache.aset(cache_key, result)
+    return result
+
+# Fila persistente para classificações assíncronas; criada na inicialização, não na importação
+job_queue = None
+job_workers = []
+jobs_available = asyncio.Event()
+
+async def job_worker():
+    while True:
+        job = await asyncio.to_thread(job_queue.claim)
+        if job is None:
+            jobs_available.clear()
+            try:
+                await asyncio.wait_for(jobs_available.wait(), ML_JOBS_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        try:
+            result = await classify_bytes(job['payload'])
+        except InvalidImageError as e:
+            await asyncio.to_thread(job_queue.fail, job['id'], f'Erro ao classificar a imagem: {str(e)}', False)
+        except Exception as e:
+            # Falhas transitórias (worker de inferência, memória) voltam para a fila com backoff
+            await asyncio.to_thread(job_queue.fail, job['id'], f'Erro ao classificar a imagem: {str(e)}')
+        else:
+            await asyncio.to_thread(job_queue.complete, job['id'], result)
+
+async def startup():
+    global job_queue
+    job_queue = await asyncio.to_thread(JobQueue)
+    if ML_PRELOAD:
+        await executor.warmup()
+    for _ in range(ML_JOB_WORKERS):
+        job_workers.append(asyncio.create_task(job_worker()))
+
+async def shutdown():
+    for worker in job_workers:
+        worker.cancel()
+    await asyncio.gather(*job_workers, return_exceptions=True)
+    job_workers.clear()
+    await batcher.close()
+    executor.shutdown()
+
+@router.get('/classify-fruit/metrics')
+async def classify_fruit_metrics(admin: CurrentUser = Depends(get_admin_user)):
+    return {**batcher.metrics.snapshot(), 'cache': result_cache.stats()}
+
+@router.get('/models')
+async def list_models():
+    return registry.describe()
+
+@router.post('/models/{name}/activate')
+async def activate_model(name: str, admin: CurrentUser = Depends(get_admin_user)):
+    try:
+        # Aquecer a nova versão nos workers antes de trocar; requisições em andamento seguem na anterior
+        await executor.warmup(name)
+        await asyncio.to_thread(registry.activate, name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    return registry.describe()
 
 @router.post('/classify-fruit')
 async def classify_fruit(file: UploadFile = File(...)):
@@ -33,16 +125,148 @@ async def classify_fruit(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail='O arquivo enviado não é uma imagem.')
     try:
         image_bytes = await file.read()
-        img = Image.open(io.BytesIO(image_bytes)).convert('RGB')
-        img_tensor = transform(img).unsqueeze(0)
-        with torch.no_grad():
-            output = model(img_tensor)
-            prob = F.softmax(output, dim=1)
-            pred = torch.argmax(prob, dim=1)
-        result = {
-            'classe': classes[pred.item()],
-            'probabilidade': float(prob[0][pred.item()])
-        }
+        result = await classify_bytes(image_bytes)
         return JSONResponse(content=result)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f'Erro ao classificar a imagem: {str(e)}') 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f'Erro ao classificar a imagem: {str(e)}') 
+
+@router.post('/classify-fruit/jobs', status_code=status.HTTP_202_ACCEPTED)
+async def submit_classification_job(
+    file: UploadFile = File(...),
+    priority: int = Query(0, ge=-10, le=10),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    if not file.content_type.startswith('image/'):
+        raise HTTPException(status_code=400, detail='O arquivo enviado não é uma imagem.')
+    image_bytes = await file.read()
+    job_id = await asyncio.to_thread(
+        job_queue.submit, image_bytes, file.filename, file.content_type, priority, owner_id=current_user.id
+    )
+    jobs_available.set()
+    return {'job_id': job_id, 'status': 'queued'}
+
+@router.get('/classify-fruit/jobs/stats')
+async def classification_job_stats(admin: CurrentUser = Depends(get_admin_user)):
+    return await asyncio.to_thread(job_queue.stats)
+
+@router.get('/classify-fruit/jobs/{job_id}')
+async def get_classification_job(job_id: str, current_user: CurrentUser = Depends(get_current_user)):
+    # Só o dono vê o job; os demais recebem 404
+    job = await asyncio.to_thread(job_queue.get, job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail='Job não encontrado')
+    return job
+
+@router.get('/classify-fruit/jobs/{job_id}/stream')
+async def stream_classification_job(job_id: str, current_user: CurrentUser = Depends(get_current_user)):
+    job = await asyncio.to_thread(job_queue.get, job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail='Job não encontrado')
+
+    async def events():
+        # Server-Sent Events: um evento a cada mudança de status, até o job terminar
+        last_status = None
+        current = job
+        while True:
+            if current['status'] != last_status:
+                last_status = current['status']
+                yield f"event: {last_status}\ndata: {json.dumps(current, ensure_ascii=False)}\n\n"
+            if last_status in (DONE, FAILED):
+                return
+            await asyncio.sleep(ML_JOBS_POLL_INTERVAL)
+            current = await asyncio.to_thread(job_queue.get, job_id, current_user.id)
+
+    return StreamingResponse(events(), media_type='text/event-stream')
+
+def _error_line(name, status_code, detail):
+    return {'arquivo': name, 'status': status_code, 'detail': detail}
+
+async def classify_chunk(chunk, model_name, model_path):
+    # Mesma semântica de erro do /classify-fruit, mas por arquivo e sem interromper o lote
+    lines = [None] * len(chunk)
+    pending = []
+    for i, (name, content_type, data, error) in enumerate(chunk):
+        if error:
+            lines[i] = _error_line(name, 413, error)
+        elif not content_type.startswith('image/'):
+            lines[i] = _error_line(name, 400, 'O arquivo enviado não é uma imagem.')
+        else:
+            key = image_key(data, model_name)
+            cached = await result_cache.aget(key)
+            if cached is not None:
+                lines[i] = {'arquivo': name, 'status': 200, **cached}
+            else:
+                pending.append((i, name, key, data))
+
+    tensors = await asyncio.gather(
+        *(executor.run(load_image_tensor, data) for _, _, _, data in pending),
+        return_exceptions=True
+    )
+    decoded = []
+    for (i, name, key, _), tensor in zip(pending, tensors):
+        if isinstance(tensor, Exception):
+            lines[i] = _error_line(name, 500, f'Erro ao classificar a imagem: {str(tensor)}')
+        else:
+            decoded.append((i, name, key, tensor))
+
+    if decoded:
+        try:
+            batch = torch.stack([tensor for _, _, _, tensor in decoded])
+            probs = await executor.run(run_forward, batch, model_name, model_path)
+        except Exception as e:
+            for i, name, _, _ in decoded:
+                lines[i] = _error_line(name, 500, f'Erro ao classificar a imagem: {str(e)}')
+        else:
+            for (i, name, key, _), prob in zip(decoded, probs):
+                result = to_result(prob)
+                await result_cache.aset(key, result)
+                lines[i] = {'arquivo': name, 'status': 200, **result}
+    return lines
+
+async def classify_stream(files):
+    model_name = registry.active
+    model_path = registry.path_for(model_name)
+    entries = iter_uploads(files)
+    while True:
+        # Só um lote de imagens fica em memória por vez, independente do tamanho do arquivo enviado
+        try:
+            chunk = await asyncio.to_thread(lambda: list(itertools.islice(entries, batcher.max_batch_size)))
+        except Exception as e:
+            yield json.dumps(_error_line(None, 400, f'Erro ao ler o arquivo compactado: {str(e)}'), ensure_ascii=False) + '\n'
+            return
+        if not chunk:
+            return
+        for line in await classify_chunk(chunk, model_name, model_path):
+            yield json.dumps(line, ensure_ascii=False) + '\n'
+
+@router.post('/classify-fruit/batch')
+async def classify_fruit_batch(files: List[UploadFile] = File(...)):
+    # Aceita um ZIP/TAR com as fotos ou várias imagens no mesmo multipart; responde em NDJSON
+    return StreamingResponse(classify_stream(files), media_type='application/x-ndjson')
+
+@router.post('/classify-fruit/tiles')
+async def classify_fruit_tiles(
+    file: UploadFile = File(...),
+    grid: int = Query(4, ge=1, le=16),
+    overlap: float = Query(0.25, ge=0, lt=1)
+):
+    # Divide a foto (ex.: uma caixa) em grid x grid janelas sobrepostas e classifica todas em um único forward
+    if not file.content_type.startswith('image/'):
+        raise HTTPException(status_code=400, detail='O arquivo enviado não é uma imagem.')
+    try:
+        image_bytes = await file.read()
+        tiles = await executor.run(tile_image_tensor, image_bytes, grid, overlap)
+        model_name = registry.active
+        probs = await executor.run(run_forward, tiles, model_name, registry.path_for(model_name))
+        rotten = probs[:, classes.index('Podre')]
+        preds = torch.argmax(probs, dim=1)
+        return JSONResponse(content={
+            'grid': grid,
+            'overlap': overlap,
+            'heatmap': rotten.reshape(grid, grid).tolist(),
+            'classes': [[classes[i] for i in row] for row in preds.reshape(grid, grid).tolist()],
+            'fracao_podre': float((preds == classes.index('Podre')).float().mean()),
+            'probabilidade_media_podre': float(rotten.mean())
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f'Erro ao classificar a imagem: {str(e)}')
@@ -1,14 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from datetime import datetime
-from src.database.database import get_db
+from src.database.database import get_async_db
 from src.models.sale import Sale
 from src.models.store import Store
-from src.models.user import User
-from src.core.security import verify_token
-from fastapi import Cookie
-from pydantic import BaseModel
+from src.core.dependencies import CurrentUser, get_current_user
+from src.core.pagination import Page, PageParams
+from src.core.bulk import BulkRowError, parse_bulk_body, validate_rows
+from pydantic import BaseModel, Field
 from src.services.sale_service import SaleService
 
 class SaleResponse(BaseModel):
@@ -16,84 +16,87 @@ class SaleResponse(BaseModel):
     value: float
     quantity: int
     fruit: str
-    created_at: str
+    created_at: Optional[datetime]
     store_id: int
 
     class Config:
         from_attributes = True
 
 class SaleCreate(BaseModel):
-    value: float
-    quantity: int
+    # Quantidade negativa viraria um crédito de estoque no débito em lote
+    value: float = Field(ge=0)
+    quantity: int = Field(gt=0)
     fruit: str
     store_id: int
 
 router = APIRouter()
 
-# Função para obter o usuário atual
-async def get_current_user(access_token: str = Cookie(None), db: Session = Depends(get_db)):
-    if not access_token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Não autenticado"
-        )
-    try:
-        payload = verify_token(access_token)
-        user = db.query(User).filter(User.email == payload["sub"]).first()
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Usuário não encontrado"
-            )
-        return user
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token inválido"
-        )
-
-# Criar uma nova venda
 @router.post("/sales/", response_model=SaleResponse, status_code=status.HTTP_201_CREATED)
 async def create_sale(
     sale_data: SaleCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return await SaleService(db).create_sale(sale_data, current_user)
+
+class BulkSalesResponse(BaseModel):
+    created: int
+    ids: List[int]
+    errors: List[BulkRowError]
+
+# Importar vendas em lote (JSON, NDJSON ou CSV com colunas value, quantity, fruit, store_id)
+@router.post("/sales/bulk", response_model=BulkSalesResponse)
+async def create_sales_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return SaleService(db).create_sale(sale_data, current_user)
+    rows = parse_bulk_body(await request.body(), request.headers.get("content-type"))
+    valid, errors = validate_rows(rows, SaleCreate)
+    report = await SaleService(db).create_sales_bulk(valid, current_user)
+    report["errors"] = sorted(errors + report["errors"], key=lambda error: error["row"])
+    return report
 
-# Listar todas as vendas do usuário
-@router.get("/sales/", response_model=List[SaleResponse])
+# Listar as vendas do usuário, paginadas por cursor e filtráveis por loja, fruta e período [date_from, date_to)
+@router.get("/sales/", response_model=Page[SaleResponse])
 async def list_sales(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    page: PageParams = Depends(),
+    store_id: Optional[int] = Query(None),
+    fruit: Optional[str] = Query(None),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return SaleService(db).list_sales(current_user)
+    return await SaleService(db).list_sales(
+        current_user, page, store_id=store_id, fruit=fruit, date_from=date_from, date_to=date_to
+    )
 
 # Obter uma venda específica
 @router.get("/sales/{sale_id}", response_model=SaleResponse)
 async def get_sale(
     sale_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return SaleService(db).get_sale(sale_id, current_user)
+    return await SaleService(db).get_sale(sale_id, current_user)
 
 # Atualizar uma venda
 @router.put("/sales/{sale_id}", response_model=SaleResponse)
 async def update_sale(
     sale_id: int,
     sale_data: SaleCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return SaleService(db).update_sale(sale_id, sale_data, current_user)
+    return await SaleService(db).update_sale(sale_id, sale_data, current_user)
 
 # Deletar uma venda
 @router.delete("/sales/{sale_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_sale(
     sale_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    SaleService(db).delete_sale(sale_id, current_user)
+    await SaleService(db).delete_sale(sale_id, current_user)
     return None 
\ No newline at end of file
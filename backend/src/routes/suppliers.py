@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, status, Cookie
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime
 from pydantic import BaseModel
 
-from src.database.database import get_db
-from src.models.user import User
-from src.core.security import verify_token
+from src.database.database import get_async_db
+from src.core.dependencies import CurrentUser, get_current_user
+from src.core.pagination import Page, PageParams
 from src.services.supplier_service import SupplierService
 
 # Pydantic Models
@@ -24,65 +25,65 @@ class SupplierUpdate(SupplierBase):
 class SupplierResponse(SupplierBase):
     id: int
     store_id: int
-    created_at: str
-    updated_at: str
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
 
     class Config:
         from_attributes = True
 
 router = APIRouter()
 
-# Dependency to get current user
-async def get_current_user(access_token: str = Cookie(None), db: Session = Depends(get_db)):
-    if not access_token:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
-    try:
-        payload = verify_token(access_token)
-        user = db.query(User).filter(User.email == payload["sub"]).first()
-        if not user:
-            raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
-        return user
-    except Exception:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
-
 @router.post("/suppliers/", response_model=SupplierResponse, status_code=status.HTTP_201_CREATED)
 async def create_supplier(
     supplier_data: SupplierCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return await SupplierService(db).create_supplier(supplier_data, current_user)
+
+# Fornecedores de todas as lojas do usuário; ?store_id= pode ser repetido para filtrar lojas
+@router.get("/suppliers/", response_model=Page[SupplierResponse])
+async def list_suppliers(
+    page: PageParams = Depends(),
+    store_id: Optional[List[int]] = Query(None),
+    fruit: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return SupplierService(db).create_supplier(supplier_data, current_user)
+    return await SupplierService(db).list_suppliers(current_user, page, store_ids=store_id, fruit=fruit)
 
-@router.get("/suppliers/store/{store_id}", response_model=List[SupplierResponse])
+@router.get("/suppliers/store/{store_id}", response_model=Page[SupplierResponse])
 async def list_suppliers_for_store(
     store_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    page: PageParams = Depends(),
+    fruit: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return SupplierService(db).list_suppliers_by_store(store_id, current_user)
+    return await SupplierService(db).list_suppliers_by_store(store_id, current_user, page, fruit=fruit)
 
 @router.get("/suppliers/{supplier_id}", response_model=SupplierResponse)
 async def get_supplier(
     supplier_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return SupplierService(db).get_supplier(supplier_id, current_user)
+    return await SupplierService(db).get_supplier(supplier_id, current_user)
 
 @router.put("/suppliers/{supplier_id}", response_model=SupplierResponse)
 async def update_supplier(
     supplier_id: int,
     supplier_data: SupplierUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return SupplierService(db).update_supplier(supplier_id, supplier_data, current_user)
+    return await SupplierService(db).update_supplier(supplier_id, supplier_data, current_user)
 
 @router.delete("/suppliers/{supplier_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_supplier(
     supplier_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    SupplierService(db).delete_supplier(supplier_id, current_user)
+    await SupplierService(db).delete_supplier(supplier_id, current_user)
     return None 
\ No newline at end of file
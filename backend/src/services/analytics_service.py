@@ -0,0 +1,117 @@
+import os
+from datetime import timedelta
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from src.database.database import dialect_insert
+from src.models.base_entity import as_utc
+from src.models.sale_rollup import SaleRollup
+from src.services.store_service import owned_store_ids
+
+# Fuso usado para decidir a que dia pertence cada venda nos totais
+ROLLUP_TIMEZONE = ZoneInfo(os.getenv("ROLLUP_TIMEZONE", "America/Sao_Paulo"))
+
+GROUP_BY = ("store", "fruit", "day", "week", "month")
+
+def rollup_day(created_at):
+    if created_at is None:
+        return None
+    return as_utc(created_at).astimezone(ROLLUP_TIMEZONE).date()
+
+def add_rollup_delta(deltas, store_id, fruit, created_at, value, quantity, sign=1):
+    """Acumula em `deltas` a contribuição (ou, com sign=-1, a retirada) de uma venda."""
+    day = rollup_day(created_at)
+    if day is None:
+        return
+    key = (store_id, fruit, day)
+    revenue, total_quantity, count = deltas.get(key, (0.0, 0, 0))
+    deltas[key] = (revenue + sign * value, total_quantity + sign * quantity, count + sign)
+
+def rollup_upsert(dialect_name, values):
+    # INSERT ... ON CONFLICT DO UPDATE somando ao total existente
+    stmt = dialect_insert(dialect_name, SaleRollup).values(values)
+    return stmt.on_conflict_do_update(
+        index_elements=[SaleRollup.store_id, SaleRollup.fruit, SaleRollup.day],
+        set_={
+            "revenue": SaleRollup.revenue + stmt.excluded.revenue,
+            "quantity": SaleRollup.quantity + stmt.excluded.quantity,
+            "sales_count": SaleRollup.sales_count + stmt.excluded.sales_count,
+        }
+    )
+
+async def apply_rollup_deltas(db, deltas):
+    """Aplica os deltas na transação corrente do chamador, com um único comando."""
+    values = [
+        {"store_id": store_id, "fruit": fruit, "day": day, "revenue": revenue, "quantity": quantity, "sales_count": count}
+        # Ordem fixa das chaves: transações concorrentes travam as linhas na mesma sequência
+        for (store_id, fruit, day), (revenue, quantity, count) in sorted(deltas.items())
+        if count or quantity or revenue
+    ]
+    if values:
+        await db.execute(rollup_upsert(db.bind.dialect.name, values))
+
+def _bucket(day, group_by):
+    if group_by == "week":
+        return day - timedelta(days=day.weekday())
+    if group_by == "month":
+        return day.replace(day=1)
+    return day
+
+def _label(value, group_by):
+    if group_by == "month":
+        return value.strftime("%Y-%m")
+    if group_by in ("day", "week"):
+        return value.isoformat()
+    return value
+
+class AnalyticsService:
+    def __init__(self, db):
+        self.db = db
+
+    async def sales_summary(self, current_user, group_by, store_id=None, fruit=None, date_from=None, date_to=None):
+        # Lido só da tabela de totais diários: o custo depende de lojas x frutas x dias, não do número de vendas
+        if group_by not in GROUP_BY:
+            raise HTTPException(status_code=400, detail=f"group_by deve ser um de: {', '.join(GROUP_BY)}")
+        filters = [SaleRollup.store_id.in_(owned_store_ids(current_user))]
+        if store_id is not None:
+            filters.append(SaleRollup.store_id == store_id)
+        if fruit:
+            filters.append(SaleRollup.fruit == fruit)
+        if date_from is not None:
+            filters.append(SaleRollup.day >= date_from)
+        if date_to is not None:
+            filters.append(SaleRollup.day < date_to)
+        key = {"store": SaleRollup.store_id, "fruit": SaleRollup.fruit}.get(group_by, SaleRollup.day)
+        rows = await self.db.execute(
+            select(key, func.sum(SaleRollup.revenue), func.sum(SaleRollup.quantity), func.sum(SaleRollup.sales_count))
+            .where(*filters)
+            .group_by(key)
+            .having(func.sum(SaleRollup.sales_count) > 0)
+            .order_by(key)
+        )
+
+        buckets = {}
+        for value, revenue, quantity, count in rows:
+            # Semana e mês são montados a partir dos dias (no máximo 366 linhas por ano)
+            if group_by in ("week", "month"):
+                value = _bucket(value, group_by)
+            totals = buckets.setdefault(value, [0.0, 0, 0])
+            totals[0] += revenue
+            totals[1] += quantity
+            totals[2] += count
+
+        items = [
+            {"key": _label(value, group_by), "revenue": revenue, "quantity": quantity, "count": count}
+            for value, (revenue, quantity, count) in buckets.items()
+        ]
+        return {
+            "group_by": group_by,
+            "items": items,
+            "total": {
+                "revenue": sum(item["revenue"] for item in items),
+                "quantity": sum(item["quantity"] for item in items),
+                "count": sum(item["count"] for item in items),
+            },
+        }
@@ -0,0 +1,162 @@
+import csv
+import io
+import os
+import zlib
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from src.database.database import AsyncSessionLocal
+from src.models.base_entity import as_utc
+from src.models.inventory import Inventory
+from src.models.sale import Sale
+from src.models.store import Store
+from src.models.supplier import Supplier
+
+# Linhas buscadas por vez no cursor do servidor; é também o tamanho de cada bloco escrito
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+
+FORMATS = ("csv", "parquet")
+
+# Colunas de cada exportação: (nome, tipo) — o tipo define a coluna no Parquet
+EXPORTS = {
+    "sales": (
+        [("id", "int"), ("created_at", "datetime"), ("store_id", "int"), ("store_name", "str"),
+         ("fruit", "str"), ("quantity", "int"), ("value", "float")],
+        lambda: select(Sale.id, Sale.created_at, Sale.store_id, Store._name, Sale.fruit, Sale.quantity, Sale.value)
+        .join(Store, Sale.store_id == Store.id),
+    ),
+    "inventory": (
+        [("id", "int"), ("store_id", "int"), ("store_name", "str"), ("fruit", "str"),
+         ("quantity", "int"), ("unit", "str"), ("updated_at", "datetime")],
+        lambda: select(Inventory.id, Inventory.store_id, Store._name, Inventory.fruit, Inventory.quantity,
+                       Inventory.unit, Inventory.updated_at)
+        .join(Store, Inventory.store_id == Store.id),
+    ),
+    "suppliers": (
+        [("id", "int"), ("store_id", "int"), ("store_name", "str"), ("name", "str"),
+         ("cnpj", "str"), ("address", "str"), ("fruits", "str")],
+        lambda: select(Supplier.id, Supplier.store_id, Store._name, Supplier.name, Supplier.cnpj,
+                       Supplier.address, Supplier.fruits)
+        .join(Store, Supplier.store_id == Store.id),
+    ),
+}
+
+async def ensure_store_owned(db, store_id, current_user):
+    # Filtro por loja de outro usuário: 404, como nas demais rotas de loja
+    if store_id is None:
+        return
+    owned = await db.scalar(select(Store.id).where(Store.id == store_id, Store.user_id == current_user.id))
+    if not owned:
+        raise HTTPException(status_code=404, detail="Loja não encontrada")
+
+def export_query(kind, current_user, store_id=None, date_from=None, date_to=None):
+    _, build = EXPORTS[kind]
+    query = build().where(Store.user_id == current_user.id)
+    model = {"sales": Sale, "inventory": Inventory, "suppliers": Supplier}[kind]
+    if store_id is not None:
+        query = query.where(model.store_id == store_id)
+    # Período [date_from, date_to) só se aplica às vendas
+    if kind == "sales":
+        if date_from is not None:
+            query = query.where(Sale.created_at >= as_utc(date_from))
+        if date_to is not None:
+            query = query.where(Sale.created_at < as_utc(date_to))
+    return query.order_by(model.id)
+
+async def stream_partitions(query, session_factory=AsyncSessionLocal, chunk_rows=EXPORT_CHUNK_ROWS):
+    # Sessão própria: o corpo da resposta é gerado depois que a rota já retornou.
+    # stream() + yield_per usa cursor no servidor, então só um bloco de linhas fica em memória.
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=chunk_rows))
+        async for partition in result.partitions():
+            yield partition
+
+def _csv_value(value):
+    if hasattr(value, "isoformat"):
+        return as_utc(value).isoformat()
+    return value
+
+async def csv_chunks(columns, partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    async for partition in partitions:
+        writer.writerows([_csv_value(value) for value in row] for row in partition)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    # Arquivo vazio ainda leva o cabeçalho
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+async def gzip_chunks(chunks):
+    # wbits=31: formato gzip, comprimido incrementalmente a cada bloco
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+class _ChunkSink(io.RawIOBase):
+    """Arquivo de saída em que o ParquetWriter escreve; os bytes são repassados e descartados."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        # O writer registra o deslocamento de cada row group no rodapé
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+async def parquet_chunks(columns, partitions, compression="snappy"):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string(), "datetime": pa.timestamp("us", tz="UTC")}
+    # Esquema fixo: um bloco com uma coluna toda nula não pode mudar o tipo no meio do arquivo
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression=compression)
+    async for partition in partitions:
+        # Cada bloco vira um row group: colunar, mas sem acumular o arquivo inteiro
+        arrays = [pa.array([row[i] for row in partition], type=schema.field(i).type) for i in range(len(columns))]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+def export_stream(kind, current_user, export_format="csv", compress=False, **filters):
+    """Devolve (gerador de bytes, media type, nome do arquivo) para a exportação pedida."""
+    if export_format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Formato deve ser um de: {', '.join(FORMATS)}")
+    columns, _ = EXPORTS[kind]
+    partitions = stream_partitions(export_query(kind, current_user, **filters))
+    if export_format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Exportação em Parquet requer o pacote pyarrow")
+        # Parquet já comprime por coluna; gzip=true troca o codec em vez de embrulhar o arquivo
+        chunks = parquet_chunks(columns, partitions, compression="gzip" if compress else "snappy")
+        return chunks, "application/vnd.apache.parquet", f"{kind}.parquet"
+    chunks = csv_chunks(columns, partitions)
+    if compress:
+        return gzip_chunks(chunks), "application/gzip", f"{kind}.csv.gz"
+    return chunks, "text/csv; charset=utf-8", f"{kind}.csv"
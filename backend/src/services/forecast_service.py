@@ -0,0 +1,231 @@
+import math
+import os
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from src.models.inventory import Inventory
+from src.models.sale_rollup import SaleRollup
+from src.models.store import Store
+from src.services.analytics_service import rollup_day
+from src.services.store_service import owned_store_ids
+from src.models.base_entity import utcnow
+
+# Histórico usado no ajuste (semanas inteiras, para a sazonalidade por dia da semana)
+FORECAST_HISTORY_WEEKS = int(os.getenv("FORECAST_HISTORY_WEEKS", "12"))
+FORECAST_MA_WINDOW = int(os.getenv("FORECAST_MA_WINDOW", "14"))
+FORECAST_ALPHA = float(os.getenv("FORECAST_ALPHA", "0.3"))
+# Prazo de entrega do fornecedor e intervalo até o próximo pedido (dias)
+FORECAST_LEAD_TIME_DAYS = int(os.getenv("FORECAST_LEAD_TIME_DAYS", "2"))
+FORECAST_REVIEW_DAYS = int(os.getenv("FORECAST_REVIEW_DAYS", "7"))
+# Fator z do estoque de segurança (1.65 ~ 95% de nível de serviço)
+FORECAST_SERVICE_Z = float(os.getenv("FORECAST_SERVICE_Z", "1.65"))
+# Validade (s) do ajuste de uma loja; limita a defasagem entre processos que não se avisam
+FORECAST_CACHE_TTL = float(os.getenv("FORECAST_CACHE_TTL", "900"))
+
+# Colunas da matriz de parâmetros: média móvel, nível, desvio e 7 fatores (segunda a domingo)
+MA, LEVEL, SIGMA, SEASONAL = 0, 1, 2, slice(3, 10)
+
+
+def index_series(store_ids, fruits):
+    """Mapeia cada linha para o índice da sua série (loja, fruta) sem laço em Python."""
+    fruit_values, fruit_codes = np.unique(fruits, return_inverse=True)
+    combined = np.asarray(store_ids, dtype=np.int64) * len(fruit_values) + fruit_codes
+    keys, series = np.unique(combined, return_inverse=True)
+    key_stores = keys // len(fruit_values)
+    key_fruits = fruit_values[keys % len(fruit_values)]
+    return list(zip(key_stores.tolist(), key_fruits.tolist())), series
+
+
+def demand_matrix(series, day_offsets, quantities, n_series, periods):
+    """Matriz (séries x dias) de quantidade vendida; dias fora da janela são descartados."""
+    inside = (day_offsets >= 0) & (day_offsets < periods)
+    flat = series[inside] * periods + day_offsets[inside]
+    counts = np.bincount(flat, weights=quantities[inside], minlength=n_series * periods)
+    return counts.reshape(n_series, periods)
+
+
+def fit(demand, start_weekday, alpha=FORECAST_ALPHA, window=FORECAST_MA_WINDOW):
+    """Ajusta média móvel, suavização exponencial e sazonalidade semanal para todas as séries.
+
+    `demand` tem um número inteiro de semanas por linha e a coluna 0 cai em
+    `start_weekday` (0 = segunda). Devolve a matriz de parâmetros (séries x 10).
+    """
+    n_series, periods = demand.shape
+    weeks = periods // 7
+    params = np.zeros((n_series, 10))
+    params[:, MA] = demand[:, -window:].mean(axis=1)
+
+    # Fatores por dia da semana: média de cada dia / média geral, reindexados para segunda = 0
+    by_weekday = np.roll(demand.reshape(n_series, weeks, 7).mean(axis=1), start_weekday, axis=1)
+    overall = by_weekday.mean(axis=1, keepdims=True)
+    seasonal = np.divide(by_weekday, overall, out=np.ones_like(by_weekday), where=overall > 0)
+    params[:, SEASONAL] = seasonal
+
+    # Suavização exponencial simples sobre a série dessazonalizada, em forma fechada:
+    # nível = soma ponderada com pesos alpha * (1 - alpha)^idade, começando pelo primeiro dia
+    column_factors = seasonal[:, (start_weekday + np.arange(periods)) % 7]
+    deseasonalized = np.divide(demand, column_factors, out=demand.astype(float), where=column_factors > 0)
+    ages = np.arange(periods - 1, -1, -1)
+    weights = alpha * (1 - alpha) ** ages
+    weights[0] = (1 - alpha) ** (periods - 1)
+    params[:, LEVEL] = deseasonalized @ weights
+
+    fitted = params[:, [LEVEL]] * column_factors[:, -window:]
+    params[:, SIGMA] = (demand[:, -window:] - fitted).std(axis=1)
+    return params
+
+
+def seasonal_sum(params, first_weekday, days):
+    """Soma dos fatores sazonais dos próximos `days` dias, por série."""
+    weekdays = (first_weekday + np.arange(days)) % 7
+    return params[:, SEASONAL][:, weekdays].sum(axis=1)
+
+
+def reorder_plan(params, on_hand, first_weekday, lead_time=FORECAST_LEAD_TIME_DAYS,
+                 review=FORECAST_REVIEW_DAYS, z=FORECAST_SERVICE_Z):
+    """Ponto de pedido e quantidade sugerida para cada linha (vetorizado)."""
+    level = params[:, LEVEL]
+    lead_demand = level * seasonal_sum(params, first_weekday, lead_time)
+    cover_demand = level * seasonal_sum(params, first_weekday, lead_time + review)
+    safety = z * params[:, SIGMA] * math.sqrt(lead_time)
+    reorder_point = lead_demand + safety
+    target = cover_demand + safety
+    suggested = np.where(on_hand <= reorder_point, np.ceil(np.maximum(target - on_hand, 0)), 0)
+    days_of_cover = np.divide(on_hand, level, out=np.full(len(level), np.inf), where=level > 0)
+    return {
+        "lead_demand": lead_demand,
+        "cover_demand": cover_demand,
+        "safety_stock": safety,
+        "reorder_point": reorder_point,
+        "suggested_quantity": suggested,
+        "days_of_cover": days_of_cover,
+    }
+
+
+class ForecastCache:
+    """Parâmetros ajustados por loja.
+
+    O ajuste usa o histórico até ontem, então vendas novas do dia não o
+    alteram (elas já aparecem no estoque atual, lido a cada consulta). Uma
+    loja só precisa ser reajustada quando vira o dia, quando o TTL expira ou
+    quando uma venda antiga é alterada ou removida (`invalidate`).
+    """
+
+    def __init__(self, ttl=FORECAST_CACHE_TTL):
+        self.ttl = ttl
+        self._stores = {}
+        self._lock = threading.Lock()
+        self.refits = 0
+
+    def get(self, store_id, day):
+        with self._lock:
+            entry = self._stores.get(store_id)
+            # O ajuste vale para o dia em que foi feito: a janela anda à meia-noite
+            if entry is None or entry[0] != day or entry[1] <= time.monotonic():
+                return None
+            return entry[2]
+
+    def put(self, store_id, day, fitted):
+        with self._lock:
+            self._stores[store_id] = (day, time.monotonic() + self.ttl, fitted)
+
+    def invalidate(self, store_id):
+        with self._lock:
+            self._stores.pop(store_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {"stores": len(self._stores), "refits": self.refits}
+
+
+forecast_cache = ForecastCache()
+
+
+class ForecastService:
+    def __init__(self, db, cache=forecast_cache):
+        self.db = db
+        self.cache = cache
+
+    async def _refit(self, store_ids, today):
+        # Um único SELECT com o histórico diário de todas as lojas desatualizadas
+        periods = FORECAST_HISTORY_WEEKS * 7
+        start = today - timedelta(days=periods)
+        rows = (await self.db.execute(
+            select(SaleRollup.store_id, SaleRollup.fruit, SaleRollup.day, SaleRollup.quantity)
+            .where(SaleRollup.store_id.in_(store_ids), SaleRollup.day >= start, SaleRollup.day < today)
+        )).all()
+        fitted = {store_id: {} for store_id in store_ids}
+        if rows:
+            stores, fruits, days, quantities = (np.array(column) for column in zip(*rows))
+            keys, series = index_series(stores, fruits.astype(str))
+            offsets = (days.astype("datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+            demand = demand_matrix(series, offsets, quantities.astype(float), len(keys), periods)
+            params = fit(demand, start.weekday())
+            for (store_id, fruit), row in zip(keys, params):
+                fitted[store_id][fruit] = row
+        for store_id, by_fruit in fitted.items():
+            self.cache.put(store_id, today, by_fruit)
+        self.cache.refits += 1
+        return fitted
+
+    async def reorder_suggestions(self, current_user, store_id=None, only_needed=True):
+        query = select(Inventory.store_id, Inventory.fruit, Inventory.quantity, Inventory.unit).where(
+            Inventory.store_id.in_(owned_store_ids(current_user))
+        )
+        if store_id is not None:
+            query = query.where(Inventory.store_id == store_id)
+        items = (await self.db.execute(query.order_by(Inventory.store_id, Inventory.fruit))).all()
+        if not items and store_id is not None:
+            owned = await self.db.scalar(select(Store.id).where(Store.id == store_id, Store.user_id == current_user.id))
+            if not owned:
+                raise HTTPException(status_code=404, detail="Loja não encontrada")
+
+        # O dia corrente ainda está em andamento: o histórico vai até ontem
+        today = rollup_day(utcnow())
+        fitted = {}
+        stale = []
+        for sid in {item.store_id for item in items}:
+            cached = self.cache.get(sid, today)
+            if cached is None:
+                stale.append(sid)
+            else:
+                fitted[sid] = cached
+        if stale:
+            fitted.update(await self._refit(stale, today))
+
+        # Frutas sem vendas no histórico ficam com parâmetros zerados (sem demanda prevista)
+        empty = np.zeros(10)
+        params = np.array([fitted[item.store_id].get(item.fruit, empty) for item in items]).reshape(len(items), 10)
+        on_hand = np.array([item.quantity for item in items], dtype=float)
+        plan = reorder_plan(params, on_hand, today.weekday())
+
+        suggestions = []
+        for i, item in enumerate(items):
+            suggested = int(plan["suggested_quantity"][i])
+            if only_needed and suggested <= 0:
+                continue
+            cover = plan["days_of_cover"][i]
+            suggestions.append({
+                "store_id": item.store_id,
+                "fruit": item.fruit,
+                "unit": item.unit,
+                "on_hand": item.quantity,
+                "moving_average": float(params[i, MA]),
+                "daily_forecast": float(params[i, LEVEL]),
+                "lead_time_demand": float(plan["lead_demand"][i]),
+                "safety_stock": float(plan["safety_stock"][i]),
+                "reorder_point": float(plan["reorder_point"][i]),
+                "suggested_quantity": suggested,
+                "days_of_cover": None if math.isinf(cover) else float(cover),
+            })
+        return {
+            "generated_for": today,
+            "lead_time_days": FORECAST_LEAD_TIME_DAYS,
+            "review_days": FORECAST_REVIEW_DAYS,
+            "items": suggestions,
+        }
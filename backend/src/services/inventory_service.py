@@ -1,56 +1,188 @@
+import os
+
 from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
 from src.models.inventory import Inventory
 from src.models.store import Store
 from src.models.inventory_factory import InventoryFactory
-from datetime import datetime
+from src.services.store_service import owned_store_ids
+from src.core.pagination import paginate
+from src.models.base_entity import utcnow
+from src.database.database import dialect_insert
+from src.core.events import entity_payload, publish_event
+
+# Linhas por comando INSERT ... ON CONFLICT na importação de estoque
+INVENTORY_UPSERT_BATCH = int(os.getenv("INVENTORY_UPSERT_BATCH", "1000"))
+UPSERT_MODES = ("set", "delta")
+
+INVENTORY_SORTS = {"fruit": Inventory.fruit, "quantity": Inventory.quantity, "created_at": Inventory.created_at, "id": Inventory.id}
+# Campos enviados nos eventos de estoque (os mesmos da resposta da API)
+INVENTORY_EVENT_FIELDS = ("id", "fruit", "quantity", "unit", "store_id", "created_at", "updated_at")
 
 class InventoryService:
     def __init__(self, db):
         self.db = db
 
-    def create_inventory_item(self, inventory_data, current_user):
-        store = self.db.query(Store).filter(Store.id == inventory_data.store_id, Store.user_id == current_user.id).first()
-        if not store:
+    async def create_inventory_item(self, inventory_data, current_user):
+        store_id = await self.db.scalar(
+            select(Store.id).where(Store.id == inventory_data.store_id, Store.user_id == current_user.id)
+        )
+        if not store_id:
             raise HTTPException(status_code=404, detail="Loja não encontrada")
-        
-        # Check if fruit already exists in this store's inventory
-        existing_item = self.db.query(Inventory).filter(Inventory.store_id == inventory_data.store_id, Inventory.fruit == inventory_data.fruit).first()
-        if existing_item:
-            raise HTTPException(status_code=400, detail="Fruta já existe no inventário desta loja")
 
+        # A restrição única (store_id, fruit) substitui a verificação prévia de duplicidade
         new_item = InventoryFactory.create_inventory(inventory_data, inventory_data.store_id)
         self.db.add(new_item)
-        self.db.commit()
-        self.db.refresh(new_item)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise HTTPException(status_code=400, detail="Fruta já existe no inventário desta loja")
+        publish_event(current_user.id, "inventory.created", new_item.store_id,
+                      entity_payload(new_item, *INVENTORY_EVENT_FIELDS))
         return new_item
 
-    def list_inventory_by_store(self, store_id, current_user):
-        store = self.db.query(Store).filter(Store.id == store_id, Store.user_id == current_user.id).first()
-        if not store:
+    async def upsert_inventory_bulk(self, rows, mode, current_user):
+        """Aplica uma contagem de estoque (mode="set") ou ajustes (mode="delta") em lote.
+
+        `rows` é uma lista de (numero_da_linha, InventoryCreate). Cada bloco de
+        INVENTORY_UPSERT_BATCH itens vira um único INSERT ... ON CONFLICT
+        (store_id, fruit) DO UPDATE, todos na mesma transação. Linhas repetidas
+        para a mesma fruta são consolidadas antes: a última vale em "set" e os
+        valores se somam em "delta".
+        """
+        if mode not in UPSERT_MODES:
+            raise HTTPException(status_code=400, detail=f"mode deve ser um de: {', '.join(UPSERT_MODES)}")
+        errors, results = [], []
+        owned = set((await self.db.scalars(select(Store.id).where(Store.user_id == current_user.id))).all())
+
+        # O Postgres não permite que um mesmo comando altere a mesma linha duas vezes
+        merged = {}
+        for number, item in rows:
+            if item.store_id not in owned:
+                errors.append({"row": number, "detail": "Loja não encontrada"})
+                continue
+            if mode == "set" and item.quantity < 0:
+                errors.append({"row": number, "detail": "A quantidade não pode ser negativa"})
+                continue
+            entry = merged.setdefault((item.store_id, item.fruit), [[], 0, item.unit])
+            entry[0].append(number)
+            entry[1] = item.quantity if mode == "set" else entry[1] + item.quantity
+            entry[2] = item.unit
+
+        now = utcnow()
+        dialect_name = self.db.bind.dialect.name
+        # Ordem fixa das chaves: importações concorrentes travam as linhas na mesma sequência
+        keys = sorted(merged)
+        for start in range(0, len(keys), INVENTORY_UPSERT_BATCH):
+            chunk = keys[start:start + INVENTORY_UPSERT_BATCH]
+            stmt = dialect_insert(dialect_name, Inventory).values([
+                {"store_id": store_id, "fruit": fruit, "quantity": merged[(store_id, fruit)][1],
+                 "unit": merged[(store_id, fruit)][2], "created_at": now, "updated_at": now}
+                for store_id, fruit in chunk
+            ])
+            if mode == "set":
+                quantity, condition = stmt.excluded.quantity, None
+            else:
+                # Ajustes que deixariam o estoque negativo não são aplicados (e não voltam no RETURNING)
+                quantity = Inventory.quantity + stmt.excluded.quantity
+                condition = quantity >= 0
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Inventory.store_id, Inventory.fruit],
+                set_={"quantity": quantity, "unit": stmt.excluded.unit, "updated_at": now},
+                where=condition
+            ).returning(Inventory.id, Inventory.store_id, Inventory.fruit, Inventory.quantity)
+            applied = {(row.store_id, row.fruit): row for row in await self.db.execute(stmt)}
+
+            # Um delta negativo para uma fruta que não existia vira uma inserção negativa: desfeita aqui
+            invalid = [row.id for row in applied.values() if row.quantity < 0]
+            if invalid:
+                await self.db.execute(
+                    delete(Inventory).where(Inventory.id.in_(invalid)).execution_options(synchronize_session=False)
+                )
+            for key in chunk:
+                numbers = merged[key][0]
+                row = applied.get(key)
+                if row is None:
+                    detail = "O ajuste deixaria o estoque negativo"
+                elif row.quantity < 0:
+                    detail = "Fruta não encontrada no estoque da loja"
+                else:
+                    results.extend(
+                        {"row": number, "store_id": row.store_id, "fruit": row.fruit, "quantity": row.quantity}
+                        for number in numbers
+                    )
+                    continue
+                errors.extend({"row": number, "detail": detail} for number in numbers)
+        await self.db.commit()
+        for store_id in sorted({result["store_id"] for result in results}):
+            publish_event(current_user.id, "inventory.bulk", store_id, {})
+
+        results.sort(key=lambda result: result["row"])
+        errors.sort(key=lambda error: error["row"])
+        return {"applied": len(results), "results": results, "errors": errors}
+
+    async def list_inventory(self, current_user, page, store_ids=None, fruit=None):
+        # Estoque de todas as lojas do usuário em um único SELECT com join na posse
+        query = select(Inventory).join(Store).where(Store.user_id == current_user.id)
+        if store_ids:
+            query = query.where(Inventory.store_id.in_(store_ids))
+        if fruit:
+            query = query.where(Inventory.fruit == fruit)
+        return await paginate(self.db, query, Inventory, page, INVENTORY_SORTS, "fruit")
+
+    async def list_inventory_by_store(self, store_id, current_user, page, fruit=None):
+        query = select(Inventory).join(Store).where(Inventory.store_id == store_id, Store.user_id == current_user.id)
+        if fruit:
+            query = query.where(Inventory.fruit == fruit)
+        result = await paginate(self.db, query, Inventory, page, INVENTORY_SORTS, "fruit")
+        # Só uma primeira página vazia precisa distinguir "estoque vazio" de "loja alheia"
+        if not result["items"] and not page.cursor:
+            await self._ensure_store_owned(store_id, current_user)
+        return result
+
+    async def _ensure_store_owned(self, store_id, current_user):
+        owned = await self.db.scalar(select(Store.id).where(Store.id == store_id, Store.user_id == current_user.id))
+        if not owned:
             raise HTTPException(status_code=404, detail="Loja não encontrada")
-        return self.db.query(Inventory).filter(Inventory.store_id == store_id).all()
 
-    def get_inventory_item(self, item_id, current_user):
-        item = self.db.query(Inventory).join(Store).filter(
+    async def get_inventory_item(self, item_id, current_user):
+        item = await self.db.scalar(select(Inventory).join(Store).where(
             Inventory.id == item_id,
             Store.user_id == current_user.id
-        ).first()
+        ))
         if not item:
             raise HTTPException(status_code=404, detail="Item do inventário não encontrado")
         return item
 
-    def update_inventory_item(self, item_id, inventory_data, current_user):
-        item = self.get_inventory_item(item_id, current_user) # Re-uses the get method to ensure ownership
-        
-        item.quantity = inventory_data.quantity
-        item.unit = inventory_data.unit
-        item.updated_at = datetime.now().isoformat()
-        
-        self.db.commit()
-        self.db.refresh(item)
+    async def update_inventory_item(self, item_id, inventory_data, current_user):
+        # UPDATE ... RETURNING com a posse verificada na própria cláusula WHERE
+        item = (await self.db.execute(
+            update(Inventory)
+            .where(Inventory.id == item_id, Inventory.store_id.in_(owned_store_ids(current_user)))
+            .values(
+                quantity=inventory_data.quantity,
+                unit=inventory_data.unit,
+                updated_at=utcnow()
+            )
+            .returning(Inventory)
+            .execution_options(synchronize_session=False)
+        )).scalar_one_or_none()
+        if not item:
+            raise HTTPException(status_code=404, detail="Item do inventário não encontrado")
+        await self.db.commit()
+        publish_event(current_user.id, "inventory.updated", item.store_id, entity_payload(item, *INVENTORY_EVENT_FIELDS))
         return item
 
-    def delete_inventory_item(self, item_id, current_user):
-        item = self.get_inventory_item(item_id, current_user) # Re-uses the get method to ensure ownership
-        self.db.delete(item)
-        self.db.commit() 
\ No newline at end of file
+    async def delete_inventory_item(self, item_id, current_user):
+        deleted = (await self.db.execute(
+            delete(Inventory)
+            .where(Inventory.id == item_id, Inventory.store_id.in_(owned_store_ids(current_user)))
+            .returning(Inventory.id, Inventory.store_id)
+            .execution_options(synchronize_session=False)
+        )).first()
+        if deleted is None:
+            raise HTTPException(status_code=404, detail="Item do inventário não encontrado")
+        await self.db.commit()
+        publish_event(current_user.id, "inventory.deleted", deleted.store_id, {"id": deleted.id})
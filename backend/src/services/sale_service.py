@@ -1,103 +1,246 @@
 from fastapi import HTTPException, status
+from sqlalchemy import case, delete, exists, insert, select, update
+from sqlalchemy.orm import aliased
 from src.models.sale import Sale
 from src.models.store import Store
-from datetime import datetime
+from src.models.base_entity import as_utc, utcnow
 from src.models.sale_factory import SaleFactory
-from src.models.user import User
 from src.models.inventory import Inventory
-from src.core.email_utils import send_email_notification
+from src.core.outbox import enqueue_notification, outbox_dispatcher
+from src.core.events import entity_payload, publish_event
+from src.services.store_service import owned_store_ids
+from src.core.pagination import paginate
+from src.services.analytics_service import add_rollup_delta, apply_rollup_deltas
+from src.services.forecast_service import forecast_cache
+
+# Colunas aceitas em ?sort= na listagem de vendas
+SALE_SORTS = {"created_at": Sale.created_at, "value": Sale.value, "quantity": Sale.quantity, "id": Sale.id}
+# Campos enviados nos eventos de venda (os mesmos da resposta da API)
+SALE_EVENT_FIELDS = ("id", "value", "quantity", "fruit", "created_at", "store_id")
 
 class SaleService:
     def __init__(self, db):
         self.db = db
 
-    def create_sale(self, sale_data, current_user):
-        store = self.db.query(Store).filter(Store.id == sale_data.store_id, Store.user_id == current_user.id).first()
-        if not store:
+    async def create_sale(self, sale_data, current_user):
+        store_name = await self.db.scalar(
+            select(Store._name).where(Store.id == sale_data.store_id, Store.user_id == current_user.id)
+        )
+        if store_name is None:
             raise HTTPException(status_code=404, detail="Loja não encontrada")
-        # Buscar item de estoque
-        inventory_item = self.db.query(Inventory).filter(
-            Inventory.store_id == sale_data.store_id,
-            Inventory.fruit == sale_data.fruit
-        ).first()
-        if not inventory_item:
-            raise HTTPException(status_code=404, detail="Fruta não encontrada no estoque da loja")
-        if inventory_item.quantity < sale_data.quantity:
-            raise HTTPException(status_code=400, detail=f"Estoque insuficiente para a fruta '{sale_data.fruit}'. Quantidade disponível: {inventory_item.quantity}")
-        # Descontar do estoque
-        inventory_item.quantity -= sale_data.quantity
-        inventory_item.updated_at = datetime.now().isoformat()
-        self.db.commit()
-        # Buscar e-mail do usuário dono da loja
-        user = self.db.query(User).filter(User.id == store.user_id).first()
-        user_email = user.email if user else None
-        # Criar venda
+        # Débito condicional: só desconta se houver saldo, sem janela entre a leitura e a escrita.
+        # Duas vendas simultâneas do mesmo item são serializadas pelo lock da linha.
+        debited = (await self.db.execute(
+            update(Inventory)
+            .where(
+                Inventory.store_id == sale_data.store_id,
+                Inventory.fruit == sale_data.fruit,
+                Inventory.quantity >= sale_data.quantity
+            )
+            .values(quantity=Inventory.quantity - sale_data.quantity, updated_at=utcnow())
+            .returning(Inventory.id, Inventory.quantity, Inventory.updated_at)
+            .execution_options(synchronize_session=False)
+        )).first()
+        if debited is None:
+            available = await self.db.scalar(
+                select(Inventory.quantity).where(Inventory.store_id == sale_data.store_id, Inventory.fruit == sale_data.fruit)
+            )
+            await self.db.rollback()
+            if available is None:
+                raise HTTPException(status_code=404, detail="Fruta não encontrada no estoque da loja")
+            raise HTTPException(status_code=400, detail=f"Estoque insuficiente para a fruta '{sale_data.fruit}'. Quantidade disponível: {available}")
+        remaining = debited.quantity
+        # A venda entra na mesma transação do débito: ou as duas são gravadas, ou nenhuma
         new_sale = SaleFactory.create_sale(sale_data, sale_data.store_id)
         self.db.add(new_sale)
-        self.db.commit()
-        self.db.refresh(new_sale)
-        # Enviar notificação por e-mail
+        rollup = {}
+        add_rollup_delta(rollup, new_sale.store_id, new_sale.fruit, new_sale.created_at, new_sale.value, new_sale.quantity)
+        await apply_rollup_deltas(self.db, rollup)
+        # E-mails vão para o outbox na mesma transação; o envio acontece em segundo plano.
+        # O dono da loja é o próprio usuário autenticado
+        user_email = current_user.email
         if user_email:
-            try:
-                send_email_notification(
-                    to_email=user_email,
-                    subject=f"Nova venda realizada - {sale_data.fruit}",
-                    body=f"Uma nova venda foi realizada na loja '{store.name}'.\nFruta: {sale_data.fruit}\nQuantidade: {sale_data.quantity}\nValor: R$ {sale_data.value:.2f}"
-                )
-            except Exception as e:
-                print(f"Erro ao enviar e-mail de notificação de venda: {e}")
-        # Notificação de estoque baixo
-        if inventory_item.quantity < 20 and user_email:
-            try:
-                send_email_notification(
-                    to_email=user_email,
+            enqueue_notification(
+                self.db, user_email,
+                subject=f"Nova venda realizada - {sale_data.fruit}",
+                body=f"Uma nova venda foi realizada na loja '{store_name}'.\nFruta: {sale_data.fruit}\nQuantidade: {sale_data.quantity}\nValor: R$ {sale_data.value:.2f}",
+                kind="sale", store_id=sale_data.store_id
+            )
+            # Notificação de estoque baixo
+            if remaining < 20:
+                enqueue_notification(
+                    self.db, user_email,
                     subject=f"Estoque baixo: {sale_data.fruit}",
-                    body=f"O estoque da fruta '{sale_data.fruit}' na loja '{store.name}' está abaixo de 20 unidades. Quantidade atual: {inventory_item.quantity}."
+                    body=f"O estoque da fruta '{sale_data.fruit}' na loja '{store_name}' está abaixo de 20 unidades. Quantidade atual: {remaining}.",
+                    kind="low_stock", store_id=sale_data.store_id
                 )
-            except Exception as e:
-                print(f"Erro ao enviar e-mail de notificação de estoque baixo: {e}")
+        await self.db.commit()
+        outbox_dispatcher.wake()
+        publish_event(current_user.id, "sale.created", new_sale.store_id, entity_payload(new_sale, *SALE_EVENT_FIELDS))
+        publish_event(current_user.id, "inventory.updated", new_sale.store_id, {
+            "id": debited.id, "fruit": new_sale.fruit, "quantity": remaining, "updated_at": debited.updated_at
+        })
         return new_sale
 
-    def list_sales(self, current_user):
-        stores = self.db.query(Store).filter(Store.user_id == current_user.id).all()
-        store_ids = [store.id for store in stores]
-        sales = self.db.query(Sale).filter(Sale.store_id.in_(store_ids)).all()
-        return sales
+    async def create_sales_bulk(self, rows, current_user):
+        """Registra um lote de vendas em uma única transação.
+
+        `rows` é uma lista de (numero_da_linha, SaleCreate). Linhas de lojas
+        alheias, frutas fora do estoque ou sem saldo suficiente (considerando
+        as linhas anteriores do mesmo lote) entram no relatório de erros; as
+        demais são inseridas com um único INSERT em lote e o estoque é
+        descontado com um único UPDATE por conjunto.
+        """
+        errors = []
+        if not rows:
+            return {"created": 0, "ids": [], "errors": errors}
+
+        owned = set((await self.db.scalars(select(Store.id).where(Store.user_id == current_user.id))).all())
+        store_ids = {sale.store_id for _, sale in rows if sale.store_id in owned}
+        fruits = {sale.fruit for _, sale in rows}
+        # Trava as linhas de estoque envolvidas até o commit (ignorado no SQLite)
+        stock = {}
+        if store_ids:
+            result = await self.db.execute(
+                select(Inventory.id, Inventory.store_id, Inventory.fruit, Inventory.quantity)
+                .where(Inventory.store_id.in_(store_ids), Inventory.fruit.in_(fruits))
+                .with_for_update()
+            )
+            stock = {(store_id, fruit): [item_id, quantity] for item_id, store_id, fruit, quantity in result}
+
+        accepted = []
+        decrements = {}
+        for number, sale in rows:
+            if sale.store_id not in owned:
+                errors.append({"row": number, "detail": "Loja não encontrada"})
+                continue
+            entry = stock.get((sale.store_id, sale.fruit))
+            if entry is None:
+                errors.append({"row": number, "detail": "Fruta não encontrada no estoque da loja"})
+                continue
+            item_id, available = entry
+            if available < sale.quantity:
+                errors.append({"row": number, "detail": f"Estoque insuficiente para a fruta '{sale.fruit}'. Quantidade disponível: {available}"})
+                continue
+            entry[1] -= sale.quantity
+            decrements[item_id] = decrements.get(item_id, 0) + sale.quantity
+            accepted.append(sale)
+
+        ids = []
+        if accepted:
+            now = utcnow()
+            ids = list((await self.db.scalars(
+                insert(Sale).returning(Sale.id),
+                [
+                    {"value": sale.value, "quantity": sale.quantity, "fruit": sale.fruit,
+                     "store_id": sale.store_id, "created_at": now, "updated_at": now}
+                    for sale in accepted
+                ]
+            )).all())
+            # quantity = quantity - CASE id WHEN ... END, para todos os itens de uma vez.
+            # A condição de saldo é repetida no UPDATE: onde não há lock de linha (SQLite)
+            # uma venda concorrente entre a leitura e a escrita desfaz o lote em vez de vender a mais.
+            debit = case(decrements, value=Inventory.id)
+            updated = await self.db.execute(
+                update(Inventory)
+                .where(Inventory.id.in_(decrements), Inventory.quantity >= debit)
+                .values(quantity=Inventory.quantity - debit, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            if updated.rowcount != len(decrements):
+                await self.db.rollback()
+                raise HTTPException(status_code=409, detail="O estoque mudou durante a importação. Tente novamente.")
+            rollup = {}
+            for sale in accepted:
+                add_rollup_delta(rollup, sale.store_id, sale.fruit, now, sale.value, sale.quantity)
+            await apply_rollup_deltas(self.db, rollup)
+
+            low_stock = [(store_id, fruit, quantity) for (store_id, fruit), (item_id, quantity) in stock.items()
+                         if item_id in decrements and quantity < 20]
+            if low_stock and current_user.email:
+                enqueue_notification(
+                    self.db, current_user.email,
+                    subject="Estoque baixo após importação de vendas",
+                    body="\n".join(f"Loja {store_id} - {fruit}: {quantity} unidades" for store_id, fruit, quantity in low_stock),
+                    kind="low_stock"
+                )
+            await self.db.commit()
+            outbox_dispatcher.wake()
+            # Lotes viram um aviso por loja: o cliente recarrega a lista em vez de receber milhares de deltas
+            for store_id in sorted({sale.store_id for sale in accepted}):
+                created = sum(1 for sale in accepted if sale.store_id == store_id)
+                publish_event(current_user.id, "sale.bulk", store_id, {"created": created})
+                publish_event(current_user.id, "inventory.bulk", store_id, {})
+
+        errors.sort(key=lambda error: error["row"])
+        return {"created": len(ids), "ids": ids, "errors": errors}
+
+    async def list_sales(self, current_user, page, store_id=None, fruit=None, date_from=None, date_to=None):
+        query = select(Sale).join(Store).where(Store.user_id == current_user.id)
+        if store_id is not None:
+            query = query.where(Sale.store_id == store_id)
+        if fruit:
+            query = query.where(Sale.fruit == fruit)
+        # Filtros de período usam o índice (store_id, created_at)
+        if date_from is not None:
+            query = query.where(Sale.created_at >= as_utc(date_from))
+        if date_to is not None:
+            query = query.where(Sale.created_at < as_utc(date_to))
+        return await paginate(self.db, query, Sale, page, SALE_SORTS, "created_at", "desc")
 
-    def get_sale(self, sale_id, current_user):
-        sale = self.db.query(Sale).join(Store).filter(
+    async def get_sale(self, sale_id, current_user):
+        sale = await self.db.scalar(select(Sale).join(Store).where(
             Sale.id == sale_id,
             Store.user_id == current_user.id
-        ).first()
+        ))
         if not sale:
             raise HTTPException(status_code=404, detail="Venda não encontrada")
         return sale
 
-    def update_sale(self, sale_id, sale_data, current_user):
-        sale = self.db.query(Sale).join(Store).filter(
-            Sale.id == sale_id,
-            Store.user_id == current_user.id
-        ).first()
-        if not sale:
+    async def update_sale(self, sale_id, sale_data, current_user):
+        # Venda e posse da loja de destino verificadas no mesmo SELECT
+        target_store = aliased(Store)
+        target_store_owned = exists().where(target_store.id == sale_data.store_id, target_store.user_id == current_user.id)
+        row = (await self.db.execute(
+            select(Sale, target_store_owned)
+            .join(Store, Sale.store_id == Store.id)
+            .where(Sale.id == sale_id, Store.user_id == current_user.id)
+        )).first()
+        if not row:
             raise HTTPException(status_code=404, detail="Venda não encontrada")
-        store = self.db.query(Store).filter(Store.id == sale_data.store_id, Store.user_id == current_user.id).first()
-        if not store:
+        sale, store_owned = row
+        if not store_owned:
             raise HTTPException(status_code=404, detail="Loja não encontrada")
+        # Os totais diários trocam a contribuição antiga da venda pela nova
+        rollup = {}
+        add_rollup_delta(rollup, sale.store_id, sale.fruit, sale.created_at, sale.value, sale.quantity, sign=-1)
+        old_store_id = sale.store_id
         sale.value = sale_data.value
         sale.quantity = sale_data.quantity
         sale.fruit = sale_data.fruit
         sale.store_id = sale_data.store_id
-        sale.updated_at = datetime.now().isoformat()
-        self.db.commit()
-        self.db.refresh(sale)
+        sale.updated_at = utcnow()
+        add_rollup_delta(rollup, sale.store_id, sale.fruit, sale.created_at, sale.value, sale.quantity)
+        await apply_rollup_deltas(self.db, rollup)
+        await self.db.commit()
+        # O histórico mudou: a previsão das lojas envolvidas precisa ser reajustada
+        forecast_cache.invalidate(old_store_id)
+        forecast_cache.invalidate(sale.store_id)
+        publish_event(current_user.id, "sale.updated", sale.store_id, entity_payload(sale, *SALE_EVENT_FIELDS))
         return sale
 
-    def delete_sale(self, sale_id, current_user):
-        sale = self.db.query(Sale).join(Store).filter(
-            Sale.id == sale_id,
-            Store.user_id == current_user.id
-        ).first()
-        if not sale:
+    async def delete_sale(self, sale_id, current_user):
+        deleted = (await self.db.execute(
+            delete(Sale)
+            .where(Sale.id == sale_id, Sale.store_id.in_(owned_store_ids(current_user)))
+            .returning(Sale.store_id, Sale.fruit, Sale.created_at, Sale.value, Sale.quantity)
+            .execution_options(synchronize_session=False)
+        )).first()
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Venda não encontrada")
-        self.db.delete(sale)
-        self.db.commit() 
\ No newline at end of file
+        rollup = {}
+        add_rollup_delta(rollup, *deleted, sign=-1)
+        await apply_rollup_deltas(self.db, rollup)
+        await self.db.commit()
+        forecast_cache.invalidate(deleted.store_id)
+        publish_event(current_user.id, "sale.deleted", deleted.store_id, {"id": sale_id})
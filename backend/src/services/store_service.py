@@ -1,33 +1,49 @@
 from fastapi import HTTPException, status
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 from src.models.store import Store
-from datetime import datetime
+from src.models.base_entity import utcnow
 from src.models.store_factory import StoreFactory
+from src.core.pagination import paginate
+
+def owned_store_ids(current_user):
+    # Subconsulta de posse, usada dentro do próprio comando para evitar um SELECT separado
+    return select(Store.id).where(Store.user_id == current_user.id)
+
+STORE_SORTS = {"name": Store._name, "created_at": Store.created_at, "id": Store.id}
 
 class StoreService:
     def __init__(self, db):
         self.db = db
 
-    def create_store(self, store_data, current_user):
-        existing_store = self.db.query(Store).filter(Store.cnpj == store_data["cnpj"]).first()
-        if existing_store:
+    async def create_store(self, store_data, current_user):
+        # A restrição UNIQUE de cnpj faz a verificação de duplicidade no próprio INSERT
+        new_store = StoreFactory.create_store(store_data, current_user.id)
+        self.db.add(new_store)
+        try:
+            await self.db.commit()
+        except IntegrityError as e:
+            await self.db.rollback()
+            if "cnpj" not in str(e.orig):
+                raise
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="CNPJ já cadastrado"
             )
-        new_store = StoreFactory.create_store(store_data, current_user.id)
-        self.db.add(new_store)
-        self.db.commit()
-        self.db.refresh(new_store)
         return new_store
 
-    def list_stores(self, current_user):
-        return self.db.query(Store).filter(Store.user_id == current_user.id).all()
+    async def list_stores(self, current_user, page, name=None):
+        query = select(Store).where(Store.user_id == current_user.id)
+        if name:
+            query = query.where(Store._name.ilike(f"%{name}%"))
+        return await paginate(self.db, query, Store, page, STORE_SORTS, "name")
 
-    def get_store(self, store_id, current_user):
-        store = self.db.query(Store).filter(
+    async def get_store(self, store_id, current_user):
+        store = await self.db.scalar(select(Store).where(
             Store.id == store_id,
             Store.user_id == current_user.id
-        ).first()
+        ))
         if not store:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -35,39 +51,42 @@ class StoreService:
             )
         return store
 
-    def update_store(self, store_id, store_data, current_user):
-        store = self.db.query(Store).filter(
-            Store.id == store_id,
-            Store.user_id == current_user.id
-        ).first()
-        if not store:
+    async def update_store(self, store_id, store_data, current_user):
+        # Loja e possível conflito de CNPJ buscados juntos
+        other = aliased(Store)
+        new_cnpj = store_data.get("cnpj")
+        row = (await self.db.execute(
+            select(Store, other.id)
+            .outerjoin(other, (other._cnpj == new_cnpj) & (other.id != Store.id))
+            .where(Store.id == store_id, Store.user_id == current_user.id)
+        )).first()
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Loja não encontrada"
             )
-        if "cnpj" in store_data and store_data["cnpj"] != store.cnpj:
-            existing_store = self.db.query(Store).filter(Store.cnpj == store_data["cnpj"]).first()
-            if existing_store:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="CNPJ já cadastrado"
-                )
+        store, conflicting_id = row
+        if conflicting_id is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="CNPJ já cadastrado"
+            )
         for key, value in store_data.items():
             setattr(store, key, value)
-        store.updated_at = datetime.now().isoformat()
-        self.db.commit()
-        self.db.refresh(store)
+        store.updated_at = utcnow()
+        await self.db.commit()
         return store
 
-    def delete_store(self, store_id, current_user):
-        store = self.db.query(Store).filter(
-            Store.id == store_id,
-            Store.user_id == current_user.id
-        ).first()
-        if not store:
+    async def delete_store(self, store_id, current_user):
+        deleted = (await self.db.execute(
+            delete(Store)
+            .where(Store.id == store_id, Store.user_id == current_user.id)
+            .returning(Store.id)
+            .execution_options(synchronize_session=False)
+        )).scalar_one_or_none()
+        if deleted is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Loja não encontrada"
             )
-        self.db.delete(store)
-        self.db.commit() 
\ No newline at end of file
+        await self.db.commit()
@@ -1,63 +1,121 @@
 from fastapi import HTTPException, status
+from sqlalchemy import and_, delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 from src.models.supplier import Supplier
 from src.models.store import Store
 from src.models.supplier_factory import SupplierFactory
-from datetime import datetime
+from src.services.store_service import owned_store_ids
+from src.core.pagination import paginate
+from src.models.base_entity import utcnow
+from src.core.events import entity_payload, publish_event
+
+SUPPLIER_SORTS = {"name": Supplier.name, "created_at": Supplier.created_at, "id": Supplier.id}
+# Campos enviados nos eventos de fornecedor (os mesmos da resposta da API)
+SUPPLIER_EVENT_FIELDS = ("id", "name", "cnpj", "address", "fruits", "store_id", "created_at", "updated_at")
 
 class SupplierService:
     def __init__(self, db):
         self.db = db
 
-    def create_supplier(self, supplier_data, current_user):
-        store = self.db.query(Store).filter(Store.id == supplier_data.store_id, Store.user_id == current_user.id).first()
-        if not store:
+    async def create_supplier(self, supplier_data, current_user):
+        # Posse da loja e CNPJ duplicado verificados no mesmo SELECT
+        row = (await self.db.execute(
+            select(Store.id, Supplier.id)
+            .outerjoin(Supplier, and_(Supplier.store_id == Store.id, Supplier.cnpj == supplier_data.cnpj))
+            .where(Store.id == supplier_data.store_id, Store.user_id == current_user.id)
+        )).first()
+        if not row:
             raise HTTPException(status_code=404, detail="Loja não encontrada")
-
-        existing_supplier = self.db.query(Supplier).filter(Supplier.store_id == supplier_data.store_id, Supplier.cnpj == supplier_data.cnpj).first()
-        if existing_supplier:
+        if row[1] is not None:
             raise HTTPException(status_code=400, detail="CNPJ do fornecedor já cadastrado para esta loja")
 
         new_supplier = SupplierFactory.create_supplier(supplier_data, supplier_data.store_id)
         self.db.add(new_supplier)
-        self.db.commit()
-        self.db.refresh(new_supplier)
+        await self._commit_unique_cnpj()
+        publish_event(current_user.id, "supplier.created", new_supplier.store_id,
+                      entity_payload(new_supplier, *SUPPLIER_EVENT_FIELDS))
         return new_supplier
 
-    def list_suppliers_by_store(self, store_id, current_user):
-        store = self.db.query(Store).filter(Store.id == store_id, Store.user_id == current_user.id).first()
-        if not store:
+    async def list_suppliers(self, current_user, page, store_ids=None, fruit=None):
+        # Fornecedores de todas as lojas do usuário em um único SELECT com join na posse
+        query = select(Supplier).join(Store).where(Store.user_id == current_user.id)
+        if store_ids:
+            query = query.where(Supplier.store_id.in_(store_ids))
+        if fruit:
+            query = query.where(Supplier.fruits.ilike(f"%{fruit}%"))
+        return await paginate(self.db, query, Supplier, page, SUPPLIER_SORTS, "name")
+
+    async def list_suppliers_by_store(self, store_id, current_user, page, fruit=None):
+        query = select(Supplier).join(Store).where(Supplier.store_id == store_id, Store.user_id == current_user.id)
+        if fruit:
+            query = query.where(Supplier.fruits.ilike(f"%{fruit}%"))
+        result = await paginate(self.db, query, Supplier, page, SUPPLIER_SORTS, "name")
+        # Só uma primeira página vazia precisa distinguir "sem fornecedores" de "loja alheia"
+        if not result["items"] and not page.cursor:
+            await self._ensure_store_owned(store_id, current_user)
+        return result
+
+    async def _commit_unique_cnpj(self):
+        # Duas requisições concorrentes podem passar pela verificação; a restrição única decide
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise HTTPException(status_code=400, detail="CNPJ do fornecedor já cadastrado para esta loja")
+
+    async def _ensure_store_owned(self, store_id, current_user):
+        owned = await self.db.scalar(select(Store.id).where(Store.id == store_id, Store.user_id == current_user.id))
+        if not owned:
             raise HTTPException(status_code=404, detail="Loja não encontrada")
-        return self.db.query(Supplier).filter(Supplier.store_id == store_id).all()
 
-    def get_supplier(self, supplier_id, current_user):
-        supplier = self.db.query(Supplier).join(Store).filter(
+    async def get_supplier(self, supplier_id, current_user):
+        supplier = await self.db.scalar(select(Supplier).join(Store).where(
             Supplier.id == supplier_id,
             Store.user_id == current_user.id
-        ).first()
+        ))
         if not supplier:
             raise HTTPException(status_code=404, detail="Fornecedor não encontrado")
         return supplier
 
-    def update_supplier(self, supplier_id, supplier_data, current_user):
-        supplier = self.get_supplier(supplier_id, current_user)
-        
-        # Check for CNPJ conflict if it's being changed
-        if supplier_data.cnpj != supplier.cnpj:
-            existing_supplier = self.db.query(Supplier).filter(Supplier.store_id == supplier.store_id, Supplier.cnpj == supplier_data.cnpj).first()
-            if existing_supplier:
-                raise HTTPException(status_code=400, detail="CNPJ do fornecedor já cadastrado para esta loja")
+    async def update_supplier(self, supplier_id, supplier_data, current_user):
+        # Fornecedor e possível conflito de CNPJ na mesma loja buscados juntos
+        other = aliased(Supplier)
+        row = (await self.db.execute(
+            select(Supplier, other.id)
+            .join(Store, Supplier.store_id == Store.id)
+            .outerjoin(other, and_(
+                other.store_id == Supplier.store_id,
+                other.cnpj == supplier_data.cnpj,
+                other.id != Supplier.id
+            ))
+            .where(Supplier.id == supplier_id, Store.user_id == current_user.id)
+        )).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Fornecedor não encontrado")
+        supplier, conflicting_id = row
+        if conflicting_id is not None:
+            raise HTTPException(status_code=400, detail="CNPJ do fornecedor já cadastrado para esta loja")
 
         supplier.name = supplier_data.name
         supplier.cnpj = supplier_data.cnpj
         supplier.address = supplier_data.address
         supplier.fruits = supplier_data.fruits
-        supplier.updated_at = datetime.now().isoformat()
-        
-        self.db.commit()
-        self.db.refresh(supplier)
+        supplier.updated_at = utcnow()
+
+        await self._commit_unique_cnpj()
+        publish_event(current_user.id, "supplier.updated", supplier.store_id,
+                      entity_payload(supplier, *SUPPLIER_EVENT_FIELDS))
         return supplier
 
-    def delete_supplier(self, supplier_id, current_user):
-        supplier = self.get_supplier(supplier_id, current_user)
-        self.db.delete(supplier)
-        self.db.commit() 
\ No newline at end of file
+    async def delete_supplier(self, supplier_id, current_user):
+        deleted = (await self.db.execute(
+            delete(Supplier)
+            .where(Supplier.id == supplier_id, Supplier.store_id.in_(owned_store_ids(current_user)))
+            .returning(Supplier.id, Supplier.store_id)
+            .execution_options(synchronize_session=False)
+        )).first()
+        if deleted is None:
+            raise HTTPException(status_code=404, detail="Fornecedor não encontrado")
+        await self.db.commit()
+        publish_event(current_user.id, "supplier.deleted", deleted.store_id, {"id": deleted.id})
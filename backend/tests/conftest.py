@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Antes de qualquer import de src: o engine é criado na importação do módulo de banco
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'tests.sqlite3')}")
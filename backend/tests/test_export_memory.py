@@ -0,0 +1,92 @@
+import asyncio
+import functools
+import gzip
+import tracemalloc
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from fastapi import HTTPException  # noqa: E402
+
+from benchmarks.export_memory import cleanup, seed  # noqa: E402
+from src.core.dependencies import CurrentUser  # noqa: E402
+from src.database.database import AsyncSessionLocal, async_engine  # noqa: E402
+from src.services import export_service  # noqa: E402
+
+ROWS = 20_000
+CHUNK_ROWS = 1_000
+# Com blocos de 1000 linhas o pico fica bem abaixo disto; carregar as 20k linhas de uma vez passa
+CEILING_BYTES = 4 * 2 ** 20
+
+
+@pytest.fixture(scope="module")
+def owner():
+    user_id, store_id = seed(ROWS)
+    yield CurrentUser(id=user_id, name="export", email=None), store_id
+    cleanup(user_id, store_id)
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(
+        export_service, "stream_partitions",
+        functools.partial(export_service.stream_partitions, chunk_rows=CHUNK_ROWS)
+    )
+
+
+async def collect(user, compress):
+    chunks, _, _ = export_service.export_stream("sales", user, "csv", compress)
+    body = b"".join([chunk async for chunk in chunks])
+    await async_engine.dispose()
+    return body
+
+
+async def consume(user, compress):
+    chunks, _, _ = export_service.export_stream("sales", user, "csv", compress)
+    total = 0
+    async for chunk in chunks:
+        total += len(chunk)
+    await async_engine.dispose()
+    return total
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_export_streams_every_row(owner, compress):
+    user, _ = owner
+    body = asyncio.run(collect(user, compress))
+    if compress:
+        body = gzip.decompress(body)
+    lines = body.decode("utf-8").splitlines()
+    assert lines[0] == "id,created_at,store_id,store_name,fruit,quantity,value"
+    assert len(lines) == ROWS + 1
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_export_memory_stays_bounded(owner, compress):
+    user, _ = owner
+    # Primeira passada fora da medição: caches de compilação de SQL e imports não contam
+    asyncio.run(consume(user, compress))
+    tracemalloc.start()
+    try:
+        asyncio.run(consume(user, compress))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < CEILING_BYTES
+
+
+def test_export_of_foreign_store_is_404(owner):
+    user, store_id = owner
+    stranger = CurrentUser(id=user.id + 10_000, name="outro", email=None)
+
+    async def request():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await export_service.ensure_store_owned(db, store_id, stranger)
+        finally:
+            await async_engine.dispose()
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(request())
+    assert error.value.status_code == 404
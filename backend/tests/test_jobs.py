@@ -0,0 +1,60 @@
+import sqlite3
+
+from src.ml.jobs import DONE, FAILED, QUEUED, JobQueue
+
+
+def make_queue(tmp_path, **options):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"), max_attempts=3, retry_backoff=0, **options)
+
+
+def test_transient_failure_is_retried(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.submit(b"imagem")
+    queue.fail(queue.claim()["id"], "erro transitório")
+    assert queue.get(job_id)["status"] == QUEUED
+    queue.complete(queue.claim()["id"], {"classe": "Normal"})
+    assert queue.get(job_id)["status"] == DONE
+
+
+def test_non_retryable_failure_fails_at_once(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.submit(b"nao-e-imagem")
+    queue.fail(queue.claim()["id"], "imagem inválida", retryable=False)
+    job = queue.get(job_id)
+    assert (job["status"], job["attempts"]) == (FAILED, 1)
+    assert queue.claim() is None
+
+
+def test_expired_lease_without_attempts_left_is_failed(tmp_path):
+    # lease_seconds=0: todo job em execução é tratado como de um worker que morreu
+    queue = make_queue(tmp_path, lease_seconds=0)
+    job_id = queue.submit(b"derruba-o-worker")
+    for attempt in range(1, 4):
+        claimed = queue.claim()
+        assert (claimed["id"], claimed["attempts"]) == (job_id, attempt - 1)
+    assert queue.claim() is None
+    job = queue.get(job_id)
+    assert (job["status"], job["attempts"]) == (FAILED, 3)
+
+
+def test_job_is_visible_only_to_its_owner(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.submit(b"imagem", owner_id=1)
+    assert queue.get(job_id, owner_id=1)["status"] == QUEUED
+    assert queue.get(job_id, owner_id=2) is None
+
+
+def test_existing_queue_file_gains_owner_column(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE classification_jobs ("
+        "id TEXT PRIMARY KEY, status TEXT NOT NULL, priority INTEGER NOT NULL DEFAULT 0, "
+        "attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL, "
+        "filename TEXT, content_type TEXT, payload BLOB, result TEXT, error TEXT, "
+        "available_at REAL NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+    )
+    conn.close()
+    queue = JobQueue(path)
+    job_id = queue.submit(b"imagem", owner_id=7)
+    assert queue.get(job_id, owner_id=7) is not None
@@ -0,0 +1,21 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.ml.model import Net  # noqa: E402
+from src.ml.variants import VARIANTS, build_variant  # noqa: E402
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_variant_forward(variant):
+    if variant == "onnx":
+        for module in ("onnx", "onnxscript", "onnxruntime"):
+            pytest.importorskip(module)
+    torch.manual_seed(0)
+    model = build_variant(Net().eval(), variant)
+    # Lote maior que o exemplo usado no trace/export: o tamanho do lote precisa continuar dinâmico
+    batch = torch.randn(4, 3, 32, 32, generator=torch.Generator().manual_seed(1))
+    with torch.no_grad():
+        logits = model(batch)
+    assert tuple(logits.shape) == (4, 2)
+    assert torch.isfinite(logits).all()
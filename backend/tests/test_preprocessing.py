@@ -0,0 +1,22 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+from benchmarks.preprocessing import PARITY_TOLERANCE, synthetic_image  # noqa: E402
+from src.ml.preprocessing import fast_image_tensor, reference_image_tensor  # noqa: E402
+
+
+@pytest.mark.parametrize("width, height, format", [
+    (1600, 1200, "JPEG"),  # decodificação reduzida a 1/8
+    (640, 480, "JPEG"),    # reduzida a 1/4
+    (48, 40, "JPEG"),      # pequena demais para o draft
+    (800, 600, "PNG"),     # sem draft: só JPEG tem decodificação reduzida
+    (20, 20, "PNG"),       # ampliada até 32x32
+])
+def test_fast_preprocessing_matches_reference(width, height, format):
+    data = synthetic_image(width, height, seed=width, format=format)
+    fast = fast_image_tensor(data)
+    reference = reference_image_tensor(data)
+    assert fast.shape == reference.shape == (3, 32, 32)
+    assert float((fast - reference).abs().max()) <= PARITY_TOLERANCE
@@ -0,0 +1,72 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from benchmarks.sale_concurrency import FRUIT, setup, teardown  # noqa: E402
+from src.database.database import AsyncSessionLocal, async_engine  # noqa: E402
+from src.database.query_counter import count_queries  # noqa: E402
+from src.services.inventory_service import InventoryService  # noqa: E402
+from src.services.sale_service import SaleService  # noqa: E402
+
+STOCK = 1_000
+BULK_ROWS = 50
+# Comandos SQL esperados por operação. Um número maior indica N+1 ou uma consulta extra no caminho quente
+LIST_SALES = 1           # SELECT paginado com join na posse
+LIST_INVENTORY = 1       # idem
+CREATE_SALE = 4          # posse da loja, UPDATE ... RETURNING do estoque, INSERT da venda, upsert do rollup
+CREATE_SALES_BULK = 5    # lojas do usuário, SELECT FOR UPDATE, INSERT em lote, UPDATE com CASE, upsert do rollup
+
+
+def page(limit=50):
+    return SimpleNamespace(cursor=None, limit=limit, sort=None, order=None)
+
+
+def sale(store_id, quantity=1):
+    return SimpleNamespace(value=1.0, quantity=quantity, fruit=FRUIT, store_id=store_id)
+
+
+async def measure(operation):
+    # Usuário sem e-mail: nenhuma notificação entra no outbox
+    user, store_id, _ = await setup(STOCK)
+    try:
+        async with AsyncSessionLocal() as db:
+            for _ in range(3):
+                await SaleService(db).create_sale(sale(store_id), user)
+        async with AsyncSessionLocal() as db:
+            with count_queries() as counter:
+                result = await operation(db, user, store_id)
+        return counter.count, result
+    finally:
+        await teardown(user.id, store_id)
+        await async_engine.dispose()
+
+
+def test_list_sales_query_budget():
+    count, result = asyncio.run(measure(lambda db, user, store_id: SaleService(db).list_sales(user, page())))
+    assert len(result["items"]) == 3
+    assert count == LIST_SALES
+
+
+def test_list_inventory_query_budget():
+    count, result = asyncio.run(measure(lambda db, user, store_id: InventoryService(db).list_inventory(user, page())))
+    assert len(result["items"]) == 1
+    assert count == LIST_INVENTORY
+
+
+def test_create_sale_query_budget():
+    count, _ = asyncio.run(measure(lambda db, user, store_id: SaleService(db).create_sale(sale(store_id), user)))
+    assert count == CREATE_SALE
+
+
+def test_create_sales_bulk_query_budget():
+    # O número de comandos não cresce com o tamanho do lote
+    async def bulk(db, user, store_id):
+        rows = [(number, sale(store_id)) for number in range(1, BULK_ROWS + 1)]
+        return await SaleService(db).create_sales_bulk(rows, user)
+
+    count, report = asyncio.run(measure(bulk))
+    assert report["created"] == BULK_ROWS
+    assert count == CREATE_SALES_BULK
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import func, select  # noqa: E402
+
+from benchmarks.sale_concurrency import sell, setup, teardown  # noqa: E402
+from src.database.database import AsyncSessionLocal, async_engine  # noqa: E402
+from src.models.inventory import Inventory  # noqa: E402
+from src.models.sale import Sale  # noqa: E402
+
+SALES = 50
+STOCK = 30
+QUANTITY = 2
+
+
+async def concurrent_sales():
+    user, store_id, item_id = await setup(STOCK)
+    try:
+        # Metade pelo caminho avulso, metade pela importação em lote, todas ao mesmo tempo
+        outcomes = await asyncio.gather(*(sell(user, store_id, QUANTITY, i % 2 == 1) for i in range(SALES)))
+        async with AsyncSessionLocal() as db:
+            final = await db.scalar(select(Inventory.quantity).where(Inventory.id == item_id))
+            sold = await db.scalar(select(func.coalesce(func.sum(Sale.quantity), 0)).where(Sale.store_id == store_id))
+            recorded = await db.scalar(select(func.count()).select_from(Sale).where(Sale.store_id == store_id))
+    finally:
+        await teardown(user.id, store_id)
+        await async_engine.dispose()
+    return outcomes, final, sold, recorded
+
+
+def test_concurrent_sales_never_oversell():
+    outcomes, final, sold, recorded = asyncio.run(concurrent_sales())
+    successes = outcomes.count("ok")
+
+    assert final >= 0
+    assert successes * QUANTITY == STOCK - final
+    assert sold == STOCK - final
+    assert recorded == successes
+    # Sem erros de concorrência do banco, toda venda com saldo disponível precisa ter passado
+    if set(outcomes) <= {"ok", "insufficient"}:
+        assert successes == STOCK // QUANTITY
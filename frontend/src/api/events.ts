@@ -0,0 +1,61 @@
+import { useEffect, useRef } from 'react';
+
+export interface LiveEvent<T = unknown> {
+  type: string;
+  store_id: number | null;
+  data: T;
+}
+
+// Eventos de entidade: "created" traz a entidade inteira; "updated" pode trazer só os campos alterados
+export type EntityDelta<T extends { id: number }> = Partial<T> & { id: number };
+
+// Assina as alterações das lojas do usuário (/events). `types` deve ser estável (constante
+// de módulo ou useMemo): cada nova referência reabre a conexão. O EventSource reconecta
+// sozinho; o servidor envia "resync" quando o cliente ficou para trás, e a cada reconexão
+// `onResync` também é chamado, pois eventos podem ter se perdido no intervalo.
+export function useLiveEvents<T>(
+  types: readonly string[],
+  onEvent: (event: LiveEvent<T>) => void,
+  onResync: () => void
+) {
+  const handlers = useRef({ onEvent, onResync });
+
+  useEffect(() => {
+    handlers.current = { onEvent, onResync };
+  });
+
+  useEffect(() => {
+    const source = new EventSource('http://localhost:8000/events', { withCredentials: true });
+    const listener = (message: MessageEvent<string>) => handlers.current.onEvent(JSON.parse(message.data) as LiveEvent<T>);
+    const resync = () => handlers.current.onResync();
+    let connected = false;
+    source.onopen = () => {
+      if (connected) {
+        resync();
+      }
+      connected = true;
+    };
+    types.forEach(type => source.addEventListener(type, listener));
+    source.addEventListener('resync', resync);
+    return () => source.close();
+  }, [types]);
+}
+
+// Aplica um evento "*.created", "*.updated" ou "*.deleted" a uma lista já carregada
+export function applyDelta<T extends { id: number }>(items: T[], event: LiveEvent<EntityDelta<T>>, prepend = false): T[] {
+  const action = event.type.split('.').pop();
+  if (action === 'deleted') {
+    return items.filter(item => item.id !== event.data.id);
+  }
+  const index = items.findIndex(item => item.id === event.data.id);
+  if (index >= 0) {
+    const next = items.slice();
+    next[index] = { ...items[index], ...event.data };
+    return next;
+  }
+  if (action === 'created') {
+    const created = event.data as T;
+    return prepend ? [created, ...items] : [...items, created];
+  }
+  return items;
+}
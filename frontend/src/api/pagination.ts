@@ -0,0 +1,24 @@
+import axios from 'axios';
+
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+  has_more: boolean;
+}
+
+export const PAGE_SIZE_MAX = 500;
+
+// Percorre todas as páginas de uma listagem curta (ex.: lojas do usuário)
+export async function fetchAllPages<T>(url: string, params: Record<string, string | number> = {}): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const response: { data: Page<T> } = await axios.get<Page<T>>(url, {
+      withCredentials: true,
+      params: { ...params, limit: PAGE_SIZE_MAX, ...(cursor ? { cursor } : {}) }
+    });
+    items.push(...response.data.items);
+    cursor = response.data.has_more ? response.data.next_cursor : null;
+  } while (cursor);
+  return items;
+}
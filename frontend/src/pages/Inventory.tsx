@@ -29,6 +29,8 @@ import DeleteIcon from '@mui/icons-material/Delete';
 import AddIcon from '@mui/icons-material/Add';
 import Sidebar from '../components/Sidebar';
 import axios from 'axios';
+import { fetchAllPages } from '../api/pagination';
+import { type EntityDelta, type LiveEvent, applyDelta, useLiveEvents } from '../api/events';
 
 // Interface for Inventory Item
 interface InventoryItem {
@@ -41,6 +43,8 @@ interface InventoryItem {
   updated_at: string;
 }
 
+const INVENTORY_EVENTS = ['inventory.created', 'inventory.updated', 'inventory.deleted', 'inventory.bulk'];
+
 // Interface for Store
 interface Store {
   id: number;
@@ -66,35 +70,17 @@ const InventoryPage = () => {
 
   const fetchStores = async () => {
     try {
-      const response = await axios.get('http://localhost:8000/stores/', {
-        withCredentials: true
-      });
-      if (Array.isArray(response.data)) {
-        setStores(response.data);
-        return response.data;
-      }
-      return [];
+      setStores(await fetchAllPages<Store>('http://localhost:8000/stores/'));
     } catch (error) {
       setStores([]);
       showSnackbar('Erro ao carregar lojas', 'error');
-      return [];
     }
   };
 
-  const fetchInventory = async (currentStores: Store[]) => {
-    if (currentStores.length === 0) {
-        setInventoryItems([]);
-        return;
-    }
+  // Itens de todas as lojas do usuário em uma única requisição
+  const fetchInventory = async () => {
     try {
-        const inventoryPromises = currentStores.map(store =>
-            axios.get(`http://localhost:8000/inventory/store/${store.id}`, {
-              withCredentials: true
-            })
-        );
-        const responses = await Promise.all(inventoryPromises);
-        const allInventory = responses.flatMap(response => response.data);
-        setInventoryItems(allInventory);
+      setInventoryItems(await fetchAllPages<InventoryItem>('http://localhost:8000/inventory/'));
     } catch (error) {
       setInventoryItems([]);
       showSnackbar('Erro ao carregar estoque', 'error');
@@ -102,14 +88,22 @@ const InventoryPage = () => {
   };
 
   const loadData = async () => {
-    const fetchedStores = await fetchStores();
-    await fetchInventory(fetchedStores);
+    await Promise.all([fetchStores(), fetchInventory()]);
   };
 
   useEffect(() => {
     loadData();
   }, []);
 
+  // Vendas também chegam aqui como "inventory.updated" com a quantidade restante
+  useLiveEvents(INVENTORY_EVENTS, (event: LiveEvent<EntityDelta<InventoryItem>>) => {
+    if (event.type === 'inventory.bulk') {
+      fetchInventory();
+    } else {
+      setInventoryItems(prev => applyDelta(prev, event));
+    }
+  }, () => fetchInventory());
+
   const handleOpenDialog = (item?: InventoryItem) => {
     if (item) {
       setEditingItem(item);
@@ -178,7 +172,6 @@ const InventoryPage = () => {
         showSnackbar('Item criado com sucesso!', 'success');
       }
       handleCloseDialog();
-      setTimeout(loadData, 500);
     } catch (error: any) {
       const errorMessage = error.response?.data?.detail || 'Erro ao salvar item';
       showSnackbar(errorMessage, 'error');
@@ -192,7 +185,6 @@ const InventoryPage = () => {
           withCredentials: true
         });
         showSnackbar('Item excluído com sucesso!', 'success');
-        setTimeout(loadData, 500);
       } catch (error) {
         showSnackbar('Erro ao excluir item', 'error');
       }
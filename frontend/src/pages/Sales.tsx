@@ -29,6 +29,11 @@ import DeleteIcon from '@mui/icons-material/Delete';
 import AddIcon from '@mui/icons-material/Add';
 import Sidebar from '../components/Sidebar';
 import axios from 'axios';
+import { type Page, fetchAllPages } from '../api/pagination';
+import { type EntityDelta, type LiveEvent, applyDelta, useLiveEvents } from '../api/events';
+
+const SALES_PAGE_SIZE = 50;
+const SALE_EVENTS = ['sale.created', 'sale.updated', 'sale.deleted', 'sale.bulk'];
 
 interface Sale {
   id: number;
@@ -46,6 +51,7 @@ interface Store {
 
 const Sales = () => {
   const [sales, setSales] = useState<Sale[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [stores, setStores] = useState<Store[]>([]);
   const [openDialog, setOpenDialog] = useState(false);
   const [editingSale, setEditingSale] = useState<Sale | null>(null);
@@ -61,30 +67,26 @@ const Sales = () => {
     severity: 'success' as 'success' | 'error'
   });
 
-  const fetchSales = async () => {
+  // Carrega a primeira página ou, com um cursor, acrescenta a próxima à lista
+  const fetchSales = async (cursor: string | null = null) => {
     try {
-      const response = await axios.get('http://localhost:8000/sales/', {
-        withCredentials: true
+      const response = await axios.get<Page<Sale>>('http://localhost:8000/sales/', {
+        withCredentials: true,
+        params: { limit: SALES_PAGE_SIZE, ...(cursor ? { cursor } : {}) }
       });
-      if (Array.isArray(response.data)) {
-        setSales(response.data);
-      } else {
+      setSales(prev => (cursor ? [...prev, ...response.data.items] : response.data.items));
+      setNextCursor(response.data.has_more ? response.data.next_cursor : null);
+    } catch (error) {
+      if (!cursor) {
         setSales([]);
       }
-    } catch (error) {
-      setSales([]);
       showSnackbar('Erro ao carregar vendas', 'error');
     }
   };
 
   const fetchStores = async () => {
     try {
-      const response = await axios.get('http://localhost:8000/stores/', {
-        withCredentials: true
-      });
-      if (Array.isArray(response.data)) {
-        setStores(response.data);
-      }
+      setStores(await fetchAllPages<Store>('http://localhost:8000/stores/'));
     } catch (error) {
       setStores([]);
     }
@@ -95,6 +97,15 @@ const Sales = () => {
     fetchStores();
   }, []);
 
+  // Vendas novas entram no topo da lista; lotes e reconexões recarregam a primeira página
+  useLiveEvents(SALE_EVENTS, (event: LiveEvent<EntityDelta<Sale>>) => {
+    if (event.type === 'sale.bulk') {
+      fetchSales();
+    } else {
+      setSales(prev => applyDelta(prev, event, true));
+    }
+  }, () => fetchSales());
+
   const handleOpenDialog = (sale?: Sale) => {
     if (sale) {
       setEditingSale(sale);
@@ -157,9 +168,6 @@ const Sales = () => {
         showSnackbar('Venda criada com sucesso!', 'success');
       }
       handleCloseDialog();
-      setTimeout(() => {
-        fetchSales();
-      }, 500);
     } catch (error) {
       showSnackbar('Erro ao salvar venda', 'error');
     }
@@ -172,9 +180,6 @@ const Sales = () => {
           withCredentials: true
         });
         showSnackbar('Venda excluída com sucesso!', 'success');
-        setTimeout(() => {
-          fetchSales();
-        }, 500);
       } catch (error) {
         showSnackbar('Erro ao excluir venda', 'error');
       }
@@ -276,6 +281,14 @@ const Sales = () => {
             </Table>
           </TableContainer>
 
+          {nextCursor && (
+            <Box sx={{ display: 'flex', justifyContent: 'center', mt: 2 }}>
+              <Button variant="outlined" onClick={() => fetchSales(nextCursor)}>
+                Carregar mais
+              </Button>
+            </Box>
+          )}
+
           <Dialog open={openDialog} onClose={handleCloseDialog} maxWidth="sm" fullWidth>
             <DialogTitle>
               {editingSale ? 'Editar Venda' : 'Nova Venda'}
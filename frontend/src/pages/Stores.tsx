@@ -25,6 +25,7 @@ import DeleteIcon from '@mui/icons-material/Delete';
 import AddIcon from '@mui/icons-material/Add';
 import Sidebar from '../components/Sidebar';
 import axios from 'axios';
+import { fetchAllPages } from '../api/pagination';
 
 interface Store {
   id: number;
@@ -56,16 +57,7 @@ const Stores = () => {
 
   const fetchStores = async () => {
     try {
-      const response = await axios.get('http://localhost:8000/stores/', {
-        withCredentials: true
-      });
-      console.log('Resposta da API:', response.data);
-      if (Array.isArray(response.data)) {
-        setStores(response.data);
-      } else {
-        console.error('Dados recebidos não são um array:', response.data);
-        setStores([]);
-      }
+      setStores(await fetchAllPages<Store>('http://localhost:8000/stores/'));
     } catch (error) {
       console.error('Erro ao buscar lojas:', error);
       showSnackbar('Erro ao carregar lojas', 'error');
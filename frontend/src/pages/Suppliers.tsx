@@ -10,6 +10,8 @@ import DeleteIcon from '@mui/icons-material/Delete';
 import AddIcon from '@mui/icons-material/Add';
 import Sidebar from '../components/Sidebar';
 import axios from 'axios';
+import { fetchAllPages } from '../api/pagination';
+import { type EntityDelta, type LiveEvent, applyDelta, useLiveEvents } from '../api/events';
 
 // Interfaces
 interface Supplier {
@@ -21,6 +23,8 @@ interface Supplier {
   store_id: number;
 }
 
+const SUPPLIER_EVENTS = ['supplier.created', 'supplier.updated', 'supplier.deleted'];
+
 interface Store {
   id: number;
   name: string;
@@ -46,31 +50,17 @@ const SuppliersPage = () => {
 
   const fetchStores = async () => {
     try {
-      const response = await axios.get('http://localhost:8000/stores/', { withCredentials: true });
-      if (Array.isArray(response.data)) {
-        setStores(response.data);
-        return response.data;
-      }
-      return [];
+      setStores(await fetchAllPages<Store>('http://localhost:8000/stores/'));
     } catch (error) {
       setStores([]);
       showSnackbar('Erro ao carregar lojas', 'error');
-      return [];
     }
   };
 
-  const fetchSuppliers = async (currentStores: Store[]) => {
-    if (currentStores.length === 0) {
-      setSuppliers([]);
-      return;
-    }
+  // Itens de todas as lojas do usuário em uma única requisição
+  const fetchSuppliers = async () => {
     try {
-      const supplierPromises = currentStores.map(store =>
-        axios.get(`http://localhost:8000/suppliers/store/${store.id}`, { withCredentials: true })
-      );
-      const responses = await Promise.all(supplierPromises);
-      const allSuppliers = responses.flatMap(response => response.data);
-      setSuppliers(allSuppliers);
+      setSuppliers(await fetchAllPages<Supplier>('http://localhost:8000/suppliers/'));
     } catch (error) {
       setSuppliers([]);
       showSnackbar('Erro ao carregar fornecedores', 'error');
@@ -78,14 +68,17 @@ const SuppliersPage = () => {
   };
 
   const loadData = async () => {
-    const fetchedStores = await fetchStores();
-    await fetchSuppliers(fetchedStores);
+    await Promise.all([fetchStores(), fetchSuppliers()]);
   };
 
   useEffect(() => {
     loadData();
   }, []);
 
+  useLiveEvents(SUPPLIER_EVENTS, (event: LiveEvent<EntityDelta<Supplier>>) => {
+    setSuppliers(prev => applyDelta(prev, event));
+  }, () => fetchSuppliers());
+
   const handleOpenDialog = (supplier?: Supplier) => {
     if (supplier) {
       setEditingSupplier(supplier);
@@ -131,7 +124,6 @@ const SuppliersPage = () => {
         showSnackbar('Fornecedor criado com sucesso!', 'success');
       }
       handleCloseDialog();
-      setTimeout(loadData, 500);
     } catch (error: any) {
       const errorMessage = error.response?.data?.detail || 'Erro ao salvar fornecedor';
       showSnackbar(errorMessage, 'error');
@@ -143,7 +135,6 @@ const SuppliersPage = () => {
       try {
         await axios.delete(`http://localhost:8000/suppliers/${id}`, { withCredentials: true });
         showSnackbar('Fornecedor excluído com sucesso!', 'success');
-        setTimeout(loadData, 500);
       } catch (error) {
         showSnackbar('Erro ao excluir fornecedor', 'error');
       }